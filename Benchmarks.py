@@ -0,0 +1,222 @@
+#Equipe 1155
+#Benchmarks : Mesure le temps de calcul et la mémoire utilisée par les calculs du projet (simulation, recherche des coefficients, approximation de la pente, lecture des fichiers, graphiques)
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import scipy
+import matplotlib
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+import SimulationCore
+import FrictionCoefficientsFinder
+import CurveFitting
+import PlotTools
+import SlopeProfiles
+import MonteCarlo
+
+PARAMETERS = {"m": 0.382, "k": 0.1, "kp": 0.3, "hp": 1, "lp": 0.5, "g": 9.81, "end": 20} #Paramètres de toutes les simulations (ceux de l'expérience)
+
+
+def renderPlot(result, uncertainty=None):
+    """Dessine x(t) et v(t) avec les fonctions de PhysicsSimulation (PlotTools.createPlots() puis PlotTools.drawAnimated()), sans fenêtre (Matplotlib Agg)
+
+    Args:
+        result (SimulationResult): Les données de la simulation
+        uncertainty (dict, optional): Les bandes d'incertitude (voir MonteCarlo.monteCarlo()). Defaults to None.
+    """
+    figure = Figure(figsize=(6, 5), dpi=100)
+    canvas = FigureCanvasAgg(figure)
+    curves = [([result.t], [values], [label], [color], ylabel, PlotTools.uncertaintyBands(uncertainty, ((label, label[0], color),)))
+              for (values, label, color, ylabel) in ((result.x, "x(t)", "blue", "x[s]"), (result.v, "v(t)", "red", "v[m/s]"))]
+    plots = PlotTools.createPlots(figure, curves, True)
+    canvas.draw()
+    PlotTools.drawAnimated(plots)
+
+
+def coldGeometry(function):
+    """Vide le cache de la découpe de la pente (SimulationCore.slopeGeometry()) avant chaque exécution d'une fonction,
+        pour mesurer le calcul complet et non une lecture du cache
+
+    Args:
+        function (function): La fonction (sans argument)
+
+    Returns:
+        function: La fonction qui vide le cache puis appelle function
+    """
+    def cold():
+        SimulationCore.slopeGeometry.cache_clear()
+        return function()
+    return cold
+
+
+def benchmarkCases(directory):
+    """Crée la liste des mesures (toujours avec les mêmes données)
+
+    Args:
+        directory (str): Un dossier temporaire pour les fichiers lus
+
+    Returns:
+        list: (nom, fonction sans argument) pour chaque mesure
+    """
+    m, k, kp, hp, lp, g, end = PARAMETERS.values()
+    cases = []
+
+    #Simulation : pente et sol séparément, à plusieurs pas (avec et sans la découpe de la pente déjà en cache)
+    for stepPente in (0.01, 0.001, 0.0001):
+        cases.append((f"slope segments stepPente={stepPente}", coldGeometry(lambda stepPente=stepPente: SimulationCore.simulateSlope(kp, m, hp, lp, g, stepPente))))
+        cases.append((f"slope segments cached stepPente={stepPente}", lambda stepPente=stepPente: SimulationCore.simulateSlope(kp, m, hp, lp, g, stepPente)))
+        cases.append((f"slope mesh stepPente={stepPente}", coldGeometry(lambda stepPente=stepPente: SimulationCore.simulateSlopeMesh(kp, m, hp, lp, g, stepPente))))
+        cases.append((f"slope mesh cached stepPente={stepPente}", lambda stepPente=stepPente: SimulationCore.simulateSlopeMesh(kp, m, hp, lp, g, stepPente)))
+        cases.append((f"slope adaptive stepPente={stepPente}", lambda stepPente=stepPente: SimulationCore.simulateSlopeAdaptive(kp, m, hp, lp, g, np.arange(-lp, 0, stepPente))))
+    xTable = np.linspace(-lp, 0, 200)
+    table = SlopeProfiles.tabulatedProfile(xTable, SimulationCore.slopeProfile(xTable, hp, lp))
+    cases.append(("slope segments tabulated stepPente=0.001", coldGeometry(lambda: SimulationCore.simulateSlope(kp, m, hp, lp, g, 0.001, table))))
+    cases.append(("slope geometry tabulated stepPente=0.001", lambda: SimulationCore.slopeGeometry.__wrapped__(table, hp, lp, 0.001)))
+    v0 = SimulationCore.simulateSlope(kp, m, hp, lp, g, 0.001)[2][-1]
+    for step in (0.01, 0.001, 0.0001):
+        for engine in ("euler", "exact"):
+            cases.append((f"ground {engine} step={step}", lambda step=step, engine=engine: SimulationCore.simulateGround(v0, k, m, end, step, engine)))
+    cases.append(("simulate default", coldGeometry(lambda: SimulationCore.simulate(m, k, kp, hp, lp, g, end))))
+    cases.append(("simulateBatch 64", lambda: SimulationCore.simulateBatch(m, np.linspace(0.05, 0.3, 64), kp, hp, lp, g, end)))
+
+    #Recherche des coefficients de frottement
+    for method in ("scan", "brent"):
+        cases.append((f"find_k {method}", coldGeometry(lambda method=method: FrictionCoefficientsFinder.find_k(3.75, 2.5, 1.5, 0.01, method))))
+
+    #Approximation de la pente (points de la pente exponentielle avec un peu de bruit)
+    rng = np.random.default_rng(1155)
+    xPoints = np.linspace(-lp, 0, 40)
+    points = list(zip(xPoints, SimulationCore.slopeProfile(xPoints, hp, lp) + rng.normal(0, 0.005, len(xPoints))))
+    cases.append(("curve_fitting exponential", lambda: CurveFitting.curve_fitting(points, exp=True)))
+    for degree in (2, 4, 6, 8):
+        cases.append((f"curve_fitting polynomial deg={degree}", lambda degree=degree: CurveFitting.curve_fitting(points, deg=degree)))
+
+    #Lecture des fichiers de données (format de experimentalData.txt et de l'export texte, puis export binaire)
+    for size in (1000, 10000, 100000):
+        data = rng.normal(size=(5, size))
+        textFile = os.path.join(directory, f"data{size}.txt")
+        binaryFile = os.path.join(directory, f"data{size}.sim")
+        np.savetxt(textFile, data.T)
+        SimulationCore.writeBinary(binaryFile, data, ("t", "x", "y", "v", "a"))
+        cases.append((f"loadtxt rows={size}", lambda textFile=textFile: np.loadtxt(textFile)))
+        cases.append((f"openBinary rows={size}", lambda binaryFile=binaryFile: np.array(SimulationCore.openBinary(binaryFile)[0])))
+
+    #Graphiques
+    result = SimulationCore.simulate(m, k, kp, hp, lp, g, end)
+    uncertainty = MonteCarlo.monteCarlo(m, k, kp, hp, lp, g, end, {"m": 0.001, "k": 0.02, "kp": 0.03, "hp": 0.005, "lp": 0.005}, 200, seed=1155)
+    cases.append(("render createPlot", lambda: renderPlot(result)))
+    cases.append(("render createPlot bands", lambda: renderPlot(result, uncertainty)))
+    return cases
+
+
+def measure(function, repeat=5):
+    """Mesure le temps de calcul (plusieurs fois, après une première exécution) et le pic de mémoire d'une fonction
+
+    Args:
+        function (function): La fonction (sans argument)
+        repeat (int, optional): Le nombre de mesures du temps. Defaults to 5.
+
+    Returns:
+        dict: Les temps médian, minimal et maximal [s] ("median", "min", "max"), le nombre de mesures ("repeat")
+            et le pic de mémoire allouée pendant une exécution [octets] ("peakMemory")
+    """
+    function() #(Première exécution : imports, caches, ...)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+
+    #(Mesure de la mémoire à part : tracemalloc ralentit le calcul)
+    tracemalloc.start()
+    try:
+        function()
+        peakMemory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {"median": statistics.median(times), "min": min(times), "max": max(times), "repeat": repeat, "peakMemory": peakMemory}
+
+
+def runBenchmarks(filter="", repeat=5, progress=print):
+    """Fait toutes les mesures
+
+    Args:
+        filter (str, optional): Seules les mesures dont le nom contient ce texte sont faites. Defaults to "".
+        repeat (int, optional): Le nombre de mesures du temps de chaque calcul. Defaults to 5.
+        progress (function, optional): Fonction appelée avec le nom de chaque mesure et son résultat (None pour ne rien afficher). Defaults to print.
+
+    Returns:
+        dict: Les informations sur la machine et les versions ("info") et le résultat de chaque mesure ("results")
+    """
+    info = {
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "scipy": scipy.__version__,
+        "matplotlib": matplotlib.__version__,
+        "machine": platform.platform(),
+        "engineVersion": SimulationCore.ENGINE_VERSION,
+        "parameters": PARAMETERS
+    }
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for (name, function) in benchmarkCases(directory):
+            if filter in name:
+                results[name] = measure(function, repeat)
+                if progress is not None:
+                    progress(f"{name:40} {results[name]['median']*1000:10.3f} ms {results[name]['peakMemory']/2**20:10.2f} Mo")
+    return {"info": info, "results": results}
+
+
+def compareBenchmarks(benchmarks, baseline, tolerance=0.2):
+    """Compare des mesures à des mesures de référence
+
+    Args:
+        benchmarks (dict): Les mesures (voir runBenchmarks())
+        baseline (dict): Les mesures de référence
+        tolerance (float, optional): L'écart relatif du temps médian en dessous duquel le temps est considéré comme identique. Defaults to 0.2.
+
+    Returns:
+        list: (nom, rapport des temps médians, rapport des pics de mémoire, "slower", "faster", "same" ou "new") pour chaque mesure
+    """
+    comparison = []
+    for (name, result) in benchmarks["results"].items():
+        reference = baseline["results"].get(name)
+        if reference is None:
+            comparison.append((name, None, None, "new"))
+            continue
+        timeRatio = result["median"] / reference["median"] if reference["median"] > 0 else float("inf")
+        memoryRatio = result["peakMemory"] / reference["peakMemory"] if reference["peakMemory"] > 0 else float("inf")
+        status = "slower" if timeRatio > 1 + tolerance else "faster" if timeRatio < 1 / (1 + tolerance) else "same"
+        comparison.append((name, timeRatio, memoryRatio, status))
+    return comparison
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mesure le temps de calcul et la mémoire des calculs du projet")
+    parser.add_argument("--output", default="benchmarks.json", help="fichier JSON où les mesures sont enregistrées")
+    parser.add_argument("--baseline", help="fichier JSON de mesures de référence à comparer")
+    parser.add_argument("--filter", default="", help="seules les mesures dont le nom contient ce texte sont faites")
+    parser.add_argument("--repeat", type=int, default=5, help="nombre de mesures du temps de chaque calcul")
+    args = parser.parse_args()
+
+    benchmarks = runBenchmarks(args.filter, args.repeat)
+    with open(args.output, "w") as f:
+        f.write(json.dumps(benchmarks, indent=4))
+
+    if args.baseline is not None:
+        with open(args.baseline, "r") as f:
+            baseline = json.loads(f.read())
+        print()
+        for (name, timeRatio, memoryRatio, status) in compareBenchmarks(benchmarks, baseline):
+            if status == "new":
+                print(f"{name:40} (pas de référence)")
+            else:
+                print(f"{name:40} temps x{timeRatio:6.2f} mémoire x{memoryRatio:6.2f} {status}")
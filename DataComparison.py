@@ -6,8 +6,15 @@ import tkinter.filedialog
 import numpy as np
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
-import json
+import SettingsStore
+import hashlib
 import os
+import SimulationCore
+import PlotTools
+
+binaryCache = False #Keep a binary copy of each parsed text file in cacheDirectory, so that it can be reopened without parsing
+cacheDirectory = "dataCache"
+CHANNELS = ("t", "x", "y", "v", "a") #Names of the first columns of the text files (the other ones are named col5, col6, ...)
 
 
 def createPlot(xValues, yValues, subplotArgs, colors, legend):
@@ -28,7 +35,7 @@ def createPlot(xValues, yValues, subplotArgs, colors, legend):
 
     #Create graphs
     for i in range(len(xValues)):
-        plot.plot(xValues[i], yValues[i], color=colors[i])
+        PlotTools.DecimatedLine(plot, xValues[i], yValues[i], color=colors[i]) #(Only about as many points as pixels)
 
     #Set ylim (better than by default)
     max = np.amax(np.array([np.amax(array) for array in yValues]))
@@ -86,33 +93,97 @@ def plotMovement():
 
 
 def load(dictionary):
-    """Tries to load settings3.json. If it doesn't exist, create it with the default settings.
+    """Tries to load settings2.json. If it doesn't exist, create it with the default settings.
 
     Args:
         dictionary (dict): The default settings
 
     Returns:
-        dict: The dictionary contained in settings3.json if it existed. Else, the default settings.
+        dict: The dictionary contained in settings2.json if it existed. Else, the default settings.
     """
-    filename = "settings2.json"
-    try:
-        with open(filename, "r") as f:
-            dictionary = json.loads(f.read())
-    except FileNotFoundError:
-        save(dictionary)
-    return dictionary
+    return settingsStore.load(dictionary)
 
 def save(dictionary):
-    """Saves current settings in settings3.json
+    """Saves current settings in settings2.json (the file is written a short time after the last change, see SettingsStore)
 
     Args:
         dictionary (dict): The settings to save
     """
-    filename = "settings2.json"
-    with open(filename, "w") as f:
-        f.write(json.dumps(dictionary, indent=4))
+    settingsStore.save(dictionary)
+
+def close():
+    """Writes the settings which are waiting and closes the window
+    """
+    settingsStore.close()
+    window.destroy()
     
 
+def loadFile(filename):
+    """Loads the data (t, x, y, v, a) contained in a file. Unchanged files (same size and modification time) are only loaded once,
+        a changed file replaces its previous version in loadedFiles (see also releaseFile()).
+
+    Args:
+        filename (string): The path to the file (text file with the columns t, x, y, v, a, binary .sim export from PhysicsSimulation
+            or .npz simulation result from SimulationCore/ResultStore)
+
+    Returns:
+        numpy.ndarray: The data (one row per quantity: t, x, y, v, a, ...), shared by all the calls for the same file
+    """
+    stat = os.stat(filename)
+    path = os.path.abspath(filename)
+    version = (stat.st_size, stat.st_mtime_ns)
+    if path not in loadedFiles or loadedFiles[path][0] != version:
+        loadedFiles[path] = (version, readFile(filename, stat))
+    return loadedFiles[path][1]
+
+
+def releaseFile(filename):
+    """Forgets the data of a file which is not opened anymore (closes its memory map if it is a .sim file)
+
+    Args:
+        filename (string): The path to the file
+    """
+    path = os.path.abspath(filename)
+    if path not in (os.path.abspath(openedFile) for openedFile in settings["openedFiles"]):
+        loadedFiles.pop(path, None)
+
+
+def readFile(filename, stat):
+    """Reads the data contained in a file (see loadFile()). If binaryCache, text files are parsed only if their binary copy is missing or outdated.
+
+    Args:
+        filename (string): The path to the file
+        stat (os.stat_result): The file's size and modification time
+
+    Returns:
+        numpy.ndarray: The data (one row per quantity: t, x, y, v, a, ...)
+    """
+    if filename.endswith(".sim"):
+        return SimulationCore.openBinary(filename)[0] #(Memory-mapped : no parsing, the data is read when it is plotted)
+    if filename.endswith(".npz"):
+        result = SimulationCore.loadResult(filename)[0]
+        return np.array((result.t, result.x, result.y, result.v, result.a))
+
+    cacheFilename = os.path.join(cacheDirectory, hashlib.sha256(os.path.abspath(filename).encode()).hexdigest()[:16] + ".sim")
+    if binaryCache:
+        try:
+            cachedData, header = SimulationCore.openBinary(cacheFilename)
+            if header["sourceSize"] == stat.st_size and header["sourceMtime"] == stat.st_mtime_ns:
+                return cachedData
+        except (OSError, ValueError, KeyError):
+            pass
+
+    fileData = np.array(np.loadtxt(filename, ndmin=2).T) #(ndmin : a file with a single line still gives one row per quantity)
+    if binaryCache:
+        channels = CHANNELS[:len(fileData)] + tuple(f"col{i}" for i in range(len(CHANNELS), len(fileData)))
+        try:
+            os.makedirs(cacheDirectory, exist_ok=True)
+            SimulationCore.writeBinary(cacheFilename, fileData, channels, sourceSize=stat.st_size, sourceMtime=stat.st_mtime_ns)
+        except OSError:
+            pass #(Read-only folder : the file will be parsed again next time)
+    return fileData
+
+
 def updateActiveGraphs(id): #
     """Updates active graphs when checkbutton value is changed
 
@@ -128,8 +199,7 @@ def addFile():
     """
     file = tkinter.filedialog.askopenfilename(initialdir=os.getcwd())
     if file != "" and len(leftColors) > 0:
-        with open(file, "r") as f:
-            data.append(np.array(np.loadtxt(file).T))
+        data.append(loadFile(file))
         colors.append(leftColors[0])
         del leftColors[0]
         settings["openedFiles"].append(file)
@@ -146,9 +216,10 @@ def removeFile(id):
     Args:
         id (int): The id of the file to remove
     """
-    del settings["openedFiles"][id]
+    filename = settings["openedFiles"].pop(id)
     save(settings)
     del data[id]
+    releaseFile(filename)
     filesTexts[id].destroy()
     del filesTexts[id]
     removeButtons[id].destroy()
@@ -168,6 +239,7 @@ def removeAllFiles():
     settings["openedFiles"] = []
     save(settings)
     data = []
+    loadedFiles.clear()
     for i in range(len(filesTexts)):
         filesTexts[i].destroy()
         removeButtons[i].destroy()
@@ -180,6 +252,7 @@ def removeAllFiles():
 
 #Get settings
 defaultSettings = {"openedFiles": [], "options": [True, False, True, True]}
+settingsStore = SettingsStore.SettingsStore("settings2.json")
 settings = load(defaultSettings)
 
 try:
@@ -192,6 +265,8 @@ except FileNotFoundError:
 window = Tk()
 window.title("Comparaison données physiques")
 window.geometry("870x610")
+settingsStore.setScheduler(window) #(Settings are written a short time after the last change)
+window.protocol("WM_DELETE_WINDOW", close)
 
 #Setting up bar (CheckButtons)
 optionsName = ("x(t)", "y(t)", "v(t)", "a(t)")
@@ -211,20 +286,20 @@ Label(settingsFrame, text="Fichiers :", font=("Calibri", 18, "bold")).place(x=5,
 Button(settingsFrame, text="Ajouter", command=addFile, bd=3, background="yellow", activebackground= "gold", font=("Calibri", 12, "bold")).place(x=8, y=480, anchor="w")
 Button(settingsFrame, text="Retirer tout", command=removeAllFiles, bd=3, background="red", activebackground= "dark red", font=("Calibri", 12, "bold")).place(x=242, y=480, anchor="e")
 data = []
+loadedFiles = {} #Absolute path -> ((size, modification time), data)
 filesTexts = []
 removeButtons = []
 colors = []
 leftColors = ["blue", "green", "red", "yellow", "orange"]
 for i in range(len(settings["openedFiles"])):
     if len(leftColors) == 0: break
-    with open(settings["openedFiles"][i], "r") as f:
-        colors.append(leftColors[0])
-        del leftColors[0]
-        data.append(np.array(np.loadtxt(settings["openedFiles"][i]).T))
-        filesTexts.append(Label(settingsFrame, text=settings["openedFiles"][i].split("/")[-1], foreground=colors[-1], font=("Calibri", 12)))
-        filesTexts[-1].place(x=8, y=60+40*i, anchor="w")
-        removeButtons.append(Button(settingsFrame, text=" x ", command=lambda id=i:removeFile(id), font=("Calibri", 12, "bold"), background="red", activebackground="dark red"))
-        removeButtons[-1].place(x=245, y=60+40*i, anchor="e")
+    colors.append(leftColors[0])
+    del leftColors[0]
+    data.append(loadFile(settings["openedFiles"][i]))
+    filesTexts.append(Label(settingsFrame, text=settings["openedFiles"][i].split("/")[-1], foreground=colors[-1], font=("Calibri", 12)))
+    filesTexts[-1].place(x=8, y=60+40*i, anchor="w")
+    removeButtons.append(Button(settingsFrame, text=" x ", command=lambda id=i:removeFile(id), font=("Calibri", 12, "bold"), background="red", activebackground="dark red"))
+    removeButtons[-1].place(x=245, y=60+40*i, anchor="e")
 
 #Setting Matplotlib canvas and toolbar
 figure = Figure(figsize = (6, 5), dpi = 100)
@@ -0,0 +1,34 @@
+#Equipe 1155
+#FileTools : Ecriture des fichiers sans jamais laisser un fichier à moitié écrit (SettingsStore, ResultStore, ParameterSweep, SimulationCore)
+
+import contextlib
+import os
+import tempfile
+
+UMASK = os.umask(0) #Droits retirés aux nouveaux fichiers (lus une seule fois : os.umask() change les droits de tout le programme)
+os.umask(UMASK)
+
+
+@contextlib.contextmanager
+def atomicWrite(filename, mode="wb"):
+    """Ecrit un fichier à part (fichier temporaire dans le même dossier) puis le renomme (os.replace) :
+        un programme qui lit le fichier voit toujours l'ancien fichier complet ou le nouveau fichier complet,
+        et un programme qui a déjà ouvert l'ancien fichier (memmap, ...) le garde intact.
+        En cas d'erreur, le fichier temporaire est supprimé et l'ancien fichier est gardé
+
+    Args:
+        filename (str): Le chemin du fichier
+        mode (str, optional): Le mode d'ouverture ("w" ou "wb"). Defaults to "wb".
+
+    Yields:
+        file: Le fichier temporaire, ouvert en écriture
+    """
+    descriptor, tmpPath = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(os.path.abspath(filename)))
+    try:
+        with os.fdopen(descriptor, mode) as f:
+            yield f
+        os.chmod(tmpPath, 0o666 & ~UMASK) #(mkstemp crée le fichier lisible seulement par son propriétaire)
+        os.replace(tmpPath, filename)
+    except BaseException:
+        os.remove(tmpPath)
+        raise
@@ -2,10 +2,11 @@
 #FrictionCoefficientsFinder : Affiche les coefficients de frottement sur la pente et sur le sol à partir de quelques données expérimentales
 
 import numpy as np
+from scipy.optimize import brentq, least_squares
+import SimulationCore
 
-def simulation(kp, m, h, w, g, step):
+def simulation(kp, m, h, w, g, step, store=None, profile=None):
     """Simule la vitesse en fin de pente pour un certain coefficient de frottement
-        (copié-collé d'une partie de la fonction simulation() de PhysicsSimulation.py)
 
     Args:
         kp (float): Le coefficient de frottement (sur la pente)
@@ -13,68 +14,147 @@ def simulation(kp, m, h, w, g, step):
         h (float): La hauteur de la pente [m]
         w (float): La largeur de la pente [m]
         g (float): La constante de gravitation
-        step (int): La taille des découpes de la pente
+        step (float): La taille des découpes de la pente
+        store (ResultStore, optional): Le dossier où chercher (et garder) le résultat. Defaults to None.
+        profile (SlopeProfile, optional): La forme de la pente (voir SlopeProfiles.py). Defaults to None (pente exponentielle).
 
     Returns:
-        _type_: _description_
+        float: La vitesse horizontale en fin de pente [m/s]
     """
-    #Simulation pente
-    xPente = np.arange(-w, 0, step)
-    yPente = h*np.e**((-3.5*xPente)/w-3.5)
-    vxPente = np.zeros_like(xPente)
-    vyPente = np.zeros_like(xPente)
-    aPente = np.zeros_like(xPente)
-    tPente = np.zeros_like(xPente)
-
-    vf = 0
-    aPente[0] = g
-    angle = np.arctan((yPente[0] - yPente[1]) / (xPente[1] - xPente[0]))
-
-    for i in range(1, len(xPente)):
-        #Analyse du petit bout de pente (supposé droit) entre le dernier point et le point actuel
-        vi = vf #Vitesse précédente
-        dx = np.sqrt((xPente[i]-xPente[i-1])**2+(yPente[i]-yPente[i-1])**2) #Taille du petit bout de pente
-        aPente[i] = g * np.sin(angle) - (kp * vi) / m #Norme de l'accélération sur le petit bout de pente (y compris frottements)
-
-        #Résolution d'un MRUA sur le petit bout de pente
-        dt = (-vi + np.sqrt(2*aPente[i]*dx + vi**2)) / aPente[i]
-        vf = np.sqrt(2*aPente[i]*dx + vi**2)
-
-        tPente[i] = tPente[i-1] + dt
-
-        angle = 0 if i == len(xPente) - 1 else np.arctan((yPente[i] - yPente[i+1]) / (xPente[i+1] - xPente[i])) #Angle du prochain bout de pente
-
-        #Vitesse exprimée dans la direction du prochain bout de pente
-        vxPente[i] = vf * np.cos(angle)
-        vyPente[i] = - vf * np.sin(angle)
+    if store is not None:
+        #(Simulation sans le sol : la dernière vitesse est celle en fin de pente)
+        return store.simulate(m, 0, kp, h, w, g, 0, stepPente=step, profile=profile).v[-1]
+    vxPente = SimulationCore.simulateSlope(kp, m, h, w, g, step, profile)[2]
     return vxPente[-1]
 
 
-def find_k(vi: float,vt: float, t: float, step: float)->tuple:
+def find_kp(vi, m, h, w, g, stepPente, tol=1e-6, maxIter=100, store=None, profile=None):
+    """Calcule le coefficient de frottement sur la pente par recherche de racine (méthode de Brent)
+
+    Args:
+        vi (float): La vitesse en bas de pente [m/s]
+        m (float): La masse du véhicule [kg]
+        h (float): La hauteur de la pente [m]
+        w (float): La largeur de la pente [m]
+        g (float): La constante de gravitation
+        stepPente (float): La taille des découpes de la pente
+        tol (float, optional): La précision voulue sur le coefficient. Defaults to 1e-6.
+        maxIter (int, optional): Le nombre maximal de simulations, encadrement et recherche compris. Defaults to 100.
+        store (ResultStore, optional): Le dossier où chercher (et garder) les résultats des simulations. Defaults to None.
+        profile (SlopeProfile, optional): La forme de la pente (voir SlopeProfiles.py). Defaults to None (pente exponentielle).
+            (La découpe de la pente est calculée une seule fois pour toutes les valeurs essayées, voir SimulationCore.slopeGeometry())
+
+    Returns:
+        tuple (float, int): Le coefficient sur la pente, Le nombre de simulations utilisées
+    """
+    nSimulations = 0
+    errors = {} #(brentq recalcule les bornes de l'encadrement : on ne les simule pas deux fois)
+
+    def error(kp):
+        nonlocal nSimulations
+        if kp not in errors:
+            nSimulations += 1
+            v = simulation(kp, m, h, w, g, stepPente, store, profile)
+            errors[kp] = -vi if np.isnan(v) else v - vi #(Pas de vitesse : le frottement est beaucoup trop grand)
+        return errors[kp]
+
+    #Le coefficient est nul si la vitesse sans frottement est déjà trop petite
+    if error(0) <= 0:
+        return (0, nSimulations)
+
+    #Encadrement du coefficient (on double la borne supérieure jusqu'à ce que la vitesse soit trop petite)
+    low, high = 0, 1
+    while error(high) > 0:
+        if nSimulations >= maxIter:
+            raise RuntimeError(f"No slope friction coefficient found below {high}")
+        low, high = high, 2*high
+
+    #La recherche n'a droit qu'aux simulations qui restent après l'encadrement
+    remaining = maxIter - nSimulations
+    if remaining < 1:
+        raise RuntimeError(f"No simulation left to find the slope friction coefficient between {low} and {high}")
+    kp = brentq(error, low, high, xtol=tol, maxiter=remaining)
+    return (kp, nSimulations)
+
+
+def find_k(vi: float,vt: float, t: float, step: float, method: str="scan", m: float=0.382, h: float=1, l: float=0.5, g: float=9.81, profile=None)->tuple:
     """Calcules le coefficient de frottement sur le sol et celui sur la pente
 
     Args:
         vi (float): La vitesse en bas de pente
         vt (float): La vitesse à un certain temps t sur le sol
         t (float): Le temps
-        step (float): Le nombre à incrémenter à chaque itération pour trouver le coefficient sur la pente
+        step (float): Le nombre à incrémenter à chaque itération pour trouver le coefficient sur la pente ("scan"),
+            ou la précision voulue sur le coefficient sur la pente ("brent")
+        method (str, optional): "scan" (on augmente le coefficient de step jusqu'à la bonne vitesse)
+            ou "brent" (recherche de racine, voir find_kp()). Defaults to "scan".
+        m (float, optional): La masse du véhicule [kg]. Defaults to 0.382.
+        h (float, optional): La hauteur de la pente [m]. Defaults to 1.
+        l (float, optional): La largeur de la pente [m]. Defaults to 0.5.
+        g (float, optional): La constante de gravitation. Defaults to 9.81.
+        profile (SlopeProfile, optional): La forme de la pente (voir SlopeProfiles.py). Defaults to None (pente exponentielle).
 
     Returns:
         tuple (float, float): Le coefficient sur le sol, Le coefficient sur la pente
     """
     #Parameters
     stepPente = 0.001
-    m = 0.382
-    h = 1
-    l = 0.5
-    g = 9.81
 
     k_pente, k = 0, 0
-    while simulation(k_pente, m, h, l, g, stepPente) > vi:
-        k_pente += step
+    if method == "brent":
+        k_pente = find_kp(vi, m, h, l, g, stepPente, tol=step, profile=profile)[0]
+    else:
+        while simulation(k_pente, m, h, l, g, stepPente, profile=profile) > vi:
+            k_pente += step
     
     k = (-m/t)*np.log(vt/vi)
 
     return (k, k_pente)
-    
-print(find_k(3.75, 2.5, 1.5, 0.01))
\ No newline at end of file
+
+
+
+def calibrate(filename="experimentalData.txt", m=0.382, h=1, l=0.5, g=9.81, k0=0.1, kp0=0.1, store=None, profile=None):
+    """Ajuste les coefficients de frottement à toutes les données expérimentales
+        (moindres carrés sur x, v et y, avec la simulation exacte sur le sol et à pas adaptatif sur la pente)
+
+    Args:
+        filename (str, optional): Le fichier de données expérimentales (colonnes t, x, y, v, a). Defaults to "experimentalData.txt".
+        m (float, optional): La masse du véhicule [kg] (non ajustée : le mouvement ne dépend que de k/m et kp/m). Defaults to 0.382.
+        h (float, optional): La hauteur de la pente [m]. Defaults to 1.
+        l (float, optional): La largeur de la pente [m]. Defaults to 0.5.
+        g (float, optional): La constante de gravitation. Defaults to 9.81.
+        k0 (float, optional): La valeur de départ du coefficient sur le sol. Defaults to 0.1.
+        kp0 (float, optional): La valeur de départ du coefficient sur la pente. Defaults to 0.1.
+        store (ResultStore, optional): Le dossier où chercher (et garder) les résultats des simulations. Defaults to None.
+        profile (SlopeProfile, optional): La forme de la pente (voir SlopeProfiles.py). Defaults to None (pente exponentielle).
+
+    Returns:
+        dict: Les valeurs ajustées ("k", "kp"), les résidus ("residuals" : écarts sur x, v et y, divisés par l'écart-type
+            des données expérimentales), le coût ("cost") et le nombre de simulations utilisées, dérivées comprises ("nfev")
+    """
+    (tExp, xExp, yExp, vExp, aExp) = np.loadtxt(filename).T
+    scales = [np.std(values) or 1 for values in (xExp, vExp, yExp)]
+    nSimulations = 0
+
+    def residuals(params):
+        nonlocal nSimulations
+        nSimulations += 1
+        k, kp = params
+        simulate = store.simulate if store is not None else SimulationCore.simulate
+        result = simulate(m, k, kp, h, l, g, np.max(tExp) + 0.01, groundEngine="exact", slopeEngine="adaptive", profile=profile)
+        return np.concatenate([
+            (np.interp(tExp, result.t, simulated) - measured) / scale
+            for simulated, measured, scale in zip((result.x, result.v, result.y), (xExp, vExp, yExp), scales)
+        ])
+
+    start = (k0, kp0)
+    fit = least_squares(residuals, start, bounds=(0, np.inf), x_scale=np.maximum(np.abs(start), 0.01))
+    (k, kp) = fit.x
+
+    return {"k": k, "kp": kp, "residuals": fit.fun, "cost": fit.cost, "nfev": nSimulations}
+
+if __name__ == "__main__":
+    print(find_k(3.75, 2.5, 1.5, 0.01))
+    print(find_kp(3.75, 0.382, 1, 0.5, 9.81, 0.001, tol=1e-6))
+    fit = calibrate()
+    print(f"k = {fit['k']}, kp = {fit['kp']} ({fit['nfev']} simulations, cost = {fit['cost']})")
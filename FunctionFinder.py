@@ -5,8 +5,8 @@ from tkinter import *
 import tkinter.filedialog
 from PIL import Image, ImageTk
 import numpy as np
-from scipy.optimize import curve_fit
-import json
+from CurveFitting import curve_fitting
+import SettingsStore
 import os
 
 tmp = None
@@ -20,23 +20,21 @@ def load(dictionary):
     Returns:
         dict: The dictionary contained in settings3.json if it existed. Else, the default settings.
     """
-    filename = "settings3.json"
-    try:
-        with open(filename, "r") as f:
-            dictionary = json.loads(f.read())
-    except FileNotFoundError:
-        save(dictionary)
-    return dictionary
+    return settingsStore.load(dictionary)
 
 def save(dictionary):
-    """Saves current settings in settings3.json
+    """Saves current settings in settings3.json (the file is written a short time after the last change, see SettingsStore)
 
     Args:
         dictionary (dict): The settings to save
     """
-    filename = "settings3.json"
-    with open(filename, "w") as f:
-        f.write(json.dumps(dictionary, indent=4))
+    settingsStore.save(dictionary)
+
+def close():
+    """Writes the settings which are waiting and closes the window
+    """
+    settingsStore.close()
+    window.destroy()
 
 
 class CoordinateSystemConverter:
@@ -88,88 +86,6 @@ def buildCoordinateConverters():
         (settings["coord2"][0], canvasHeight-settings["coord2"][1]))
 
 
-def curve_fitting(points: list, **kwargs):
-    """Find the best curve fit of a list of points
-
-    Args:
-        points (list): List of points to find the equation
-        **kwargs : deg= degree_of_the_polynomial if you want a polynomial equation or exp=True if you want an exponential equation
-                   oddTerms=True if you want odd power terms in your polynomial equation
-    
-    Returns:
-        (string, list): (expression of the function, list of points)
-    """
-    keys = kwargs.keys()
-
-    x_data = [float(i[0]) for i in points]
-    y_data = [float(i[1]) for i in points]
-
-    #Sort both list based on x values by ascending order
-    zipped_lists = zip(x_data, y_data)
-    sorted_pairs = sorted(zipped_lists)
-    tuples = zip(*sorted_pairs)
-    x_data, y_data = [ list(tuple) for tuple in  tuples]
-
-    interval = (x_data[0] - (x_data[-1]-x_data[0])/20, x_data[-1] + (x_data[-1]-x_data[0])/20)
-    if "interval" in keys:
-        interval = kwargs["interval"]
-
-    if 'exp' in keys and kwargs['exp']: #Exponential curve
-        for i in range(len(y_data)): #Set the negative y values to 0.001 (to be able to apply the log)
-            if y_data[i] <= 0:
-                y_data[i] = 0.001
-        exponential_equation = lambda x, a, b: a*x+b
-        coefficients = curve_fit(exponential_equation, x_data, np.log(y_data), maxfev=5000)[0] #Use SciPy to find the best curve
-        a, b = coefficients[0],coefficients[1]
-
-        normal = "xEe0123456789+-()."
-        super_s = "ˣᴱᵉ⁰¹²³⁴⁵⁶⁷⁸⁹⁺⁻⁽⁾·"
-        res = f'({round(a,2)}x + {round(b,2)})'.maketrans(''.join(normal), ''.join(super_s)) #Make the expression
-        return ( #Return the expression and a list of points to draw the function
-            f'e' + f'{round(a,2)}x + {round(b,2)}'.translate(res).replace(' ⁺ ⁻', ' ⁻ '), 
-            [(i, np.exp(a*i + b)) for i in np.arange(interval[0], interval[1]+(interval[1]-interval[0])/50, (interval[1]-interval[0])/50)]
-        )
-    
-    elif 'deg' in keys: #Polynomial curve
-        deg = kwargs['deg']
-        odd = True
-        if 'oddTerms' in kwargs:
-            odd = kwargs['oddTerms']
-        coefficients = curve_fit(polynomialBuilder(deg, odd), x_data, y_data, maxfev=5000)[0] #Use SciPy to find the best curve
-
-        normal = "0123456789"
-        super_s = "⁰¹²³⁴⁵⁶⁷⁸⁹"
-        length = len(coefficients)
-        #Create y(x) to be able to create a list of points to draw the function
-        pow = 1
-        if odd:
-            y = lambda x: sum([coefficients[i]*(x**i) for i in range(length)])
-            pow = 1
-        else:
-            y = lambda x: sum([coefficients[i]*(x**(2*i)) for i in range(length)])
-            pow = 2
-        #Make the expression
-        expression = "".join([(str(round(coefficients[length - i - 1], 2))+ 'x' + f'{(length - i - 1)*pow}'.translate(f'{length - i - 1}'.maketrans(''.join(normal), ''.join(super_s))) + ' + ') for i in range(length)]).replace(' + -',' - ')[:-5]
-        return ( #Return the expression and the list of points
-            expression, 
-            [(i, y(i)) for i in np.arange(interval[0], interval[1]+(interval[1]-interval[0])/50, (interval[1]-interval[0])/50)]
-        )
-
-def polynomialBuilder(degree, oddTerms=True):
-    """Generates a polynomial function with given degree
-
-    Args:
-        degree (int): The degree of the polynomial
-        oddTerms (bool, optional): Wether or not the polynomial includes odd exponents terms. Defaults to True.
-
-    Returns:
-        _type_: _description_
-    """
-    parameters = ",".join(f"c{i}" for i in range(degree+1) if oddTerms or i%2 == 0)
-    result = "+".join(f"c{i}*x**{i}" for i in range(degree+1) if oddTerms or i%2 == 0)
-    return eval(f"lambda x,{parameters}: {result}")
-
-
 def getImage(filename, xMax, yMax):
     """Resizes the image to fit the canvas
 
@@ -503,7 +419,10 @@ window.geometry(f"1100x{50+canvasHeight}+0+0")
 
 #Get settings
 defaultSettings = {"file": "", "function": "polynomial", "polynomialDegree": 2, "polynomialOddTerms": 1, "points": [], "coord1": [12, canvasHeight-12, 0, 0], "coord2": [112, canvasHeight-12, 1, 0], "coordinates": 1, "maxInterval": 0, "showAxis": 0}
+settingsStore = SettingsStore.SettingsStore("settings3.json")
 settings = load(defaultSettings)
+settingsStore.setScheduler(window) #(Settings are written a short time after the last change)
+window.protocol("WM_DELETE_WINDOW", close)
 
 #Create the coordinates converters
 tkinterToUser, userToTkinter = None, None
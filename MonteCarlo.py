@@ -0,0 +1,198 @@
+#Equipe 1155
+#MonteCarlo : Propage les incertitudes des paramètres mesurés (m, k, kp, hp, lp) jusqu'aux résultats de la simulation (méthode de Monte-Carlo)
+
+import warnings
+import numpy as np
+import SimulationCore
+
+
+class RunningStatistics:
+    """Moyenne et écart-type de chaque colonne, calculés ligne par ligne sans garder les lignes (méthode de Welford, les NaN sont ignorés)"""
+
+    def __init__(self, width):
+        """Initialise les statistiques (aucune ligne)
+
+        Args:
+            width (int): Le nombre de colonnes
+        """
+        self.count = np.zeros(width)
+        self.mean = np.zeros(width)
+        self.m2 = np.zeros(width) #Somme des carrés des écarts à la moyenne
+
+    def add(self, rows):
+        """Ajoute des lignes aux statistiques
+
+        Args:
+            rows (numpy.ndarray): Les lignes, de forme (N, width)
+        """
+        valid = ~np.isnan(rows)
+        count = np.sum(valid, axis=0)
+        total = self.count + count
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(count > 0, np.nansum(rows, axis=0) / count, 0)
+            m2 = np.nansum((rows - mean)**2, axis=0)
+            delta = mean - self.mean
+            #Combinaison des statistiques des anciennes lignes et des nouvelles (Chan et al.)
+            self.mean = np.where(total > 0, self.mean + delta * count / total, 0)
+            self.m2 = np.where(total > 0, self.m2 + m2 + delta**2 * self.count * count / total, 0)
+        self.count = total
+
+    def std(self):
+        """Renvoie l'écart-type de chaque colonne
+
+        Returns:
+            numpy.ndarray: L'écart-type (NaN pour les colonnes avec moins de deux valeurs)
+        """
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.count > 1, np.sqrt(self.m2 / (self.count - 1)), np.nan)
+
+
+class Histogram:
+    """Histogramme de chaque colonne (nombre de valeurs dans chaque intervalle), rempli ligne par ligne sans garder les lignes,
+        pour calculer des percentiles à partir de toutes les lignes ajoutées (les NaN sont ignorés).
+        Les intervalles d'une colonne sont fixés par les premières valeurs de cette colonne (avec une marge) ;
+        les valeurs en dehors sont comptées à part, entre la plus petite (ou la plus grande) valeur vue et le bord des intervalles"""
+
+    def __init__(self, width, bins=512):
+        """Initialise l'histogramme (aucune ligne)
+
+        Args:
+            width (int): Le nombre de colonnes
+            bins (int, optional): Le nombre d'intervalles de chaque colonne. Defaults to 512.
+        """
+        self.bins = bins
+        self.counts = np.zeros((width, bins + 2), dtype=np.int32) #(Intervalle 0 : valeurs sous low, intervalle bins+1 : valeurs au-dessus de high)
+        self.low = np.full(width, np.nan)
+        self.high = np.full(width, np.nan)
+        self.minimum = np.full(width, np.inf)
+        self.maximum = np.full(width, -np.inf)
+
+    def add(self, rows):
+        """Ajoute des lignes à l'histogramme
+
+        Args:
+            rows (numpy.ndarray): Les lignes, de forme (N, width)
+        """
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning) #(Colonnes sans aucune valeur : avant le début de toutes les pentes)
+            rowsMin, rowsMax = np.nanmin(rows, axis=0), np.nanmax(rows, axis=0)
+        self.minimum, self.maximum = np.fmin(self.minimum, rowsMin), np.fmax(self.maximum, rowsMax)
+
+        #Intervalles des colonnes qui ont leurs premières valeurs : étendue de ces valeurs, plus une marge pour les lignes suivantes
+        new = np.isnan(self.low) & ~np.isnan(rowsMin)
+        if np.any(new):
+            span = rowsMax[new] - rowsMin[new]
+            scale = np.nanmax(rowsMax) - np.nanmin(rowsMin) #(Marge des colonnes avec une seule valeur : étendue de toutes les colonnes)
+            margin = np.maximum(span / 4 + scale / 100, 1e-9 * np.maximum(1, np.abs(rowsMin[new])))
+            self.low[new], self.high[new] = rowsMin[new] - margin, rowsMax[new] + margin
+
+        with np.errstate(invalid="ignore"):
+            index = np.floor((rows - self.low) / (self.high - self.low) * self.bins) + 1
+        valid = ~np.isnan(index)
+        index = np.clip(index[valid], 0, self.bins + 1).astype(np.int64)
+        columns = np.broadcast_to(np.arange(self.counts.shape[0]), rows.shape)[valid]
+        self.counts += np.bincount(columns * (self.bins + 2) + index, minlength=self.counts.size).reshape(self.counts.shape).astype(np.int32)
+
+    def percentiles(self, q):
+        """Calcule des percentiles de chaque colonne (interpolation linéaire dans l'intervalle qui contient le percentile)
+
+        Args:
+            q (tuple): Les percentiles (entre 0 et 100)
+
+        Returns:
+            numpy.ndarray: Les percentiles, de forme (len(q), width) (NaN pour les colonnes sans aucune valeur)
+        """
+        cumulative = np.cumsum(self.counts, axis=1)
+        total = cumulative[:, -1]
+        width = (self.high - self.low) / self.bins
+        result = []
+        for percentile in q:
+            rank = percentile / 100 * total
+            index = np.minimum(np.sum(cumulative < rank[:, None], axis=1), self.bins + 1)
+            count = np.take_along_axis(self.counts, index[:, None], axis=1)[:, 0]
+            before = np.take_along_axis(cumulative, index[:, None], axis=1)[:, 0] - count
+            left = np.where(index == 0, self.minimum, np.where(index == self.bins + 1, self.high, self.low + (index - 1) * width))
+            right = np.where(index == 0, self.low, np.where(index == self.bins + 1, self.maximum, self.low + index * width))
+            with np.errstate(invalid="ignore", divide="ignore"):
+                fraction = np.where(count > 0, (rank - before) / count, 0)
+                result.append(np.where(total > 0, left + fraction * (right - left), np.nan))
+        return np.array(result)
+
+
+def sampleParameters(values, uncertainties, size, rng):
+    """Tire des jeux de paramètres au hasard (loi normale autour des valeurs mesurées)
+
+    Args:
+        values (dict): Les valeurs mesurées ("m", "k", "kp", "hp", "lp")
+        uncertainties (dict): L'écart-type de chaque paramètre (0 si absent)
+        size (int): Le nombre de jeux de paramètres
+        rng (numpy.random.Generator): Le générateur de nombres aléatoires
+
+    Returns:
+        dict: Un tableau de taille size pour chaque paramètre
+    """
+    minimums = {"m": 1e-6, "k": 0, "kp": 0, "hp": 1e-6, "lp": 1e-6} #(Une masse ou une pente de taille nulle n'a pas de sens)
+    return {name: np.maximum(rng.normal(values[name], uncertainties.get(name, 0), size), minimums[name]) for name in minimums}
+
+
+def monteCarlo(m, k, kp, hp, lp, g, end, uncertainties, samples=2000, batchSize=100, step=0.01, stepPente=0.001, percentiles=(5, 50, 95), bins=512, channels=("x", "v", "e_cin", "e_pot", "e_tot"), seed=None, profile=None):
+    """Simule de nombreux jeux de paramètres tirés au hasard autour des valeurs mesurées, par paquets (voir SimulationCore.simulateBatch()),
+        et calcule la moyenne, l'écart-type et des percentiles de chaque grandeur à chaque instant.
+        La mémoire utilisée ne dépend pas du nombre de simulations (statistiques calculées au fur et à mesure)
+
+    Args:
+        m, k, kp, hp, lp, g (float): Les valeurs mesurées des paramètres (voir SimulationCore.simulate())
+        end (float): La durée simulée sur le sol [s]
+        uncertainties (dict): L'écart-type de chaque paramètre ("m", "k", "kp", "hp", "lp" ; 0 si absent)
+        samples (int, optional): Le nombre de simulations. Defaults to 2000.
+        batchSize (int, optional): Le nombre de simulations faites à la fois. Defaults to 100.
+        step (float, optional): Le pas de temps des résultats [s]. Defaults to 0.01.
+        stepPente (float, optional): La taille des découpes de la pente [m]. Defaults to 0.001.
+        percentiles (tuple, optional): Les percentiles calculés. Defaults to (5, 50, 95).
+        bins (int, optional): Le nombre d'intervalles des histogrammes utilisés pour calculer les percentiles (voir Histogram). Defaults to 512.
+        channels (tuple, optional): Les grandeurs (attributs de SimulationResult). Defaults to ("x", "v", "e_cin", "e_pot", "e_tot").
+        seed (int, optional): La graine du générateur de nombres aléatoires. Defaults to None.
+        profile (SlopeProfile, optional): La forme de la pente, mise à l'échelle de hp et lp tirés au hasard (voir SlopeProfiles.py). Defaults to None (pente exponentielle).
+
+    Returns:
+        dict: Les instants ("t", t=0 : fin de la pente), le nombre de simulations ("samples"), les percentiles ("percentiles"),
+            et pour chaque grandeur sa moyenne ("mean"), son écart-type ("std") et ses percentiles ("bands", tableau de forme (len(percentiles), len(t))).
+            Avant le début de la pente d'une simulation, ses valeurs ne sont pas comptées.
+    """
+    rng = np.random.default_rng(seed)
+    values = {"m": m, "k": k, "kp": kp, "hp": hp, "lp": lp}
+    t = None
+    statistics, histograms = {}, {}
+    for start in range(0, samples, batchSize):
+        params = sampleParameters(values, uncertainties, min(batchSize, samples - start), rng)
+        result = SimulationCore.simulateBatch(params["m"], params["k"], params["kp"], params["hp"], params["lp"], g, end, step, stepPente, groundEngine="exact", profile=profile)
+        groundSize = len(np.arange(0, end, step))
+        slopeSize = result.t.shape[1] - groundSize
+
+        if t is None:
+            #Instants des résultats : la pente la plus longue du premier paquet (+25%), puis le sol (mêmes instants que simulateBatch())
+            slopeTime = np.nanmax(-result.t[:, 0]) * 1.25
+            t = np.concatenate((-np.arange(step, slopeTime + step, step)[::-1], np.arange(0, end, step)))
+            statistics = {channel: RunningStatistics(len(t)) for channel in channels}
+            histograms = {channel: Histogram(len(t), bins) for channel in channels}
+        tPente = t[:len(t) - groundSize]
+
+        rows = np.empty((len(result.t), len(t)))
+        for channel in channels:
+            data = getattr(result, channel)
+            rows[:, len(tPente):] = data[:, slopeSize:]
+            for i in range(len(data)):
+                #(Sur la pente, chaque simulation a ses propres instants)
+                valid = ~np.isnan(result.t[i, :slopeSize])
+                rows[i, :len(tPente)] = np.interp(tPente, result.t[i, :slopeSize][valid], data[i, :slopeSize][valid], left=np.nan)
+            statistics[channel].add(rows)
+            histograms[channel].add(rows)
+
+    return {
+        "t": t,
+        "samples": samples,
+        "percentiles": percentiles,
+        "mean": {channel: statistics[channel].mean for channel in channels},
+        "std": {channel: statistics[channel].std() for channel in channels},
+        "bands": {channel: histograms[channel].percentiles(percentiles) for channel in channels}
+    }
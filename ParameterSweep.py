@@ -0,0 +1,178 @@
+#Equipe 1155
+#ParameterSweep : Simule une grille de paramètres (k, kp, m, hp, lp, g) sur tous les processeurs et garde les grandeurs principales de chaque simulation
+
+import json
+import multiprocessing
+import os
+import time
+from multiprocessing import shared_memory
+import numpy as np
+import FileTools
+import SimulationCore
+import SlopeProfiles
+
+PARAMETERS = ("m", "k", "kp", "hp", "lp", "g") #Colonnes de la grille (ordre des arguments de SimulationCore.simulate())
+METRICS = ("exitSpeed", "slopeTime", "stopDistance", "energyLost") #Colonnes des résultats : vitesse en fin de pente, durée de la pente, distance d'arrêt sur le sol, énergie perdue sur la pente
+
+
+def sweepGrid(m, k, kp, hp, lp, g=9.81):
+    """Crée la grille de toutes les combinaisons des valeurs données
+
+    Args:
+        m, k, kp, hp, lp, g (float or list): Les valeurs de chaque paramètre (voir SimulationCore.simulate())
+
+    Returns:
+        numpy.ndarray: La grille, de forme (N, 6) (une ligne par simulation, colonnes dans l'ordre de PARAMETERS)
+    """
+    values = [np.atleast_1d(np.asarray(param, dtype=float)) for param in (m, k, kp, hp, lp, g)]
+    return np.stack([column.ravel() for column in np.meshgrid(*values, indexing="ij")], axis=1)
+
+
+def batchMetrics(result):
+    """Calcule les grandeurs principales de chaque ligne d'un résultat de SimulationCore.simulateBatch()
+
+    Args:
+        result (SimulationResult): Les données des simulations (tableaux de forme (N, T))
+
+    Returns:
+        numpy.ndarray: Les grandeurs, de forme (N, 4) (colonnes dans l'ordre de METRICS)
+    """
+    rows = np.arange(len(result.t))
+    first = np.argmax(~np.isnan(result.t), axis=1) #Haut de la pente (le début des lignes est rempli de NaN)
+    slopeEnd = np.argmax(result.t >= 0, axis=1) #Fin de la pente (t=0)
+    stopDistance = result.stopDistance if result.stopDistance is not None else np.full(len(rows), np.nan)
+    return np.stack((
+        result.v[rows, slopeEnd],
+        -result.t[rows, first],
+        stopDistance,
+        result.e_tot[rows, first] - result.e_tot[rows, slopeEnd] #(Perdue par frottement sur la pente ; sur le sol, toute l'énergie est perdue jusqu'à l'arrêt)
+    ), axis=1)
+
+
+def sweepChunk(task):
+    """Simule un morceau de la grille et écrit ses grandeurs dans la mémoire partagée (fonction exécutée par les processus)
+
+    Args:
+        task (tuple): Le nom de la mémoire partagée, le nombre de lignes de la grille, le début et la fin du morceau,
+            les lignes de la grille du morceau, la durée simulée sur le sol et les autres arguments de SimulationCore.simulateBatch()
+
+    Returns:
+        tuple (int, int): Le début et la fin du morceau
+    """
+    (name, size, start, stop, params, end, kwargs) = task
+    memory = shared_memory.SharedMemory(name=name)
+    try:
+        metrics = np.ndarray((size, len(METRICS)), dtype=np.float64, buffer=memory.buf)
+        result = SimulationCore.simulateBatch(*params.T, end, **kwargs)
+        metrics[start:stop] = batchMetrics(result)
+        del metrics #(La mémoire partagée ne peut pas être fermée tant qu'un tableau l'utilise)
+    finally:
+        memory.close()
+    return (start, stop)
+
+
+def saveCheckpoint(filename, params, metrics, done, settings):
+    """Enregistre l'avancement d'un balayage (écrit à part puis renommé : le fichier n'est jamais à moitié écrit)
+
+    Args:
+        filename (str): Le fichier .npz
+        params (numpy.ndarray): La grille
+        metrics (numpy.ndarray): Les grandeurs déjà calculées
+        done (numpy.ndarray): Les lignes déjà calculées
+        settings (dict): Les autres paramètres du balayage
+    """
+    with FileTools.atomicWrite(filename) as f:
+        np.savez(f, params=params, metrics=metrics, done=done, settings=json.dumps(settings))
+
+
+def loadCheckpoint(filename, params, settings):
+    """Charge l'avancement d'un balayage enregistré avec saveCheckpoint()
+
+    Args:
+        filename (str): Le fichier .npz
+        params (numpy.ndarray): La grille du balayage à reprendre
+        settings (dict): Les autres paramètres du balayage à reprendre
+
+    Returns:
+        (numpy.ndarray, numpy.ndarray): Les grandeurs déjà calculées, Les lignes déjà calculées (None, None si le fichier n'existe pas)
+    """
+    if not os.path.exists(filename):
+        return None, None
+    with np.load(filename) as data:
+        if not np.array_equal(data["params"], params) or json.loads(str(data["settings"])) != settings:
+            raise ValueError(f"{filename} is the checkpoint of another sweep")
+        return data["metrics"], data["done"]
+
+
+def sweep(params, end, processes=None, chunkSize=32, checkpoint=None, checkpointInterval=10, progress=None, step=0.001, stepPente=0.001, groundEngine="exact", stopSpeed=0.01, stopEnergy=None, profile=None):
+    """Simule toutes les lignes d'une grille de paramètres, réparties entre plusieurs processus
+        (chaque processus simule chunkSize lignes à la fois avec SimulationCore.simulateBatch() et n'écrit que leurs grandeurs principales dans une mémoire partagée)
+
+    Args:
+        params (numpy.ndarray): La grille (voir sweepGrid())
+        end (float): La durée simulée sur le sol [s]
+        processes (int, optional): Le nombre de processus (1 : tout est calculé dans ce processus). Defaults to None (un par processeur).
+        chunkSize (int, optional): Le nombre de lignes simulées à la fois par un processus. Defaults to 32.
+        checkpoint (str, optional): Le fichier .npz où l'avancement est enregistré ; s'il existe déjà, le balayage reprend là où il s'était arrêté. Defaults to None.
+        checkpointInterval (float, optional): Le temps entre deux enregistrements de l'avancement [s]. Defaults to 10.
+        progress (function, optional): Fonction appelée après chaque morceau avec le nombre de lignes calculées et le nombre total de lignes. Defaults to None.
+        step, stepPente, groundEngine, stopSpeed, stopEnergy (optional): Voir SimulationCore.simulateBatch() (un critère d'arrêt est nécessaire pour la distance d'arrêt).
+        profile (SlopeProfile, optional): La forme de la pente (voir SlopeProfiles.py ; envoyée aux processus : une fonction doit être définie dans un module). Defaults to None (pente exponentielle).
+
+    Returns:
+        numpy.ndarray: Les grandeurs de chaque ligne, de forme (N, 4) (colonnes dans l'ordre de METRICS, NaN pour la distance d'arrêt si le véhicule ne s'arrête pas)
+    """
+    params = np.asarray(params, dtype=float)
+    size = len(params)
+    kwargs = {"step": step, "stepPente": stepPente, "groundEngine": groundEngine, "stopSpeed": stopSpeed, "stopEnergy": stopEnergy, "profile": profile}
+    settings = dict(kwargs, end=end, chunkSize=chunkSize)
+    del settings["profile"]
+    if profile not in (None, SlopeProfiles.EXPONENTIAL):
+        settings["profile"] = profile.key #(Pente par défaut : mêmes paramètres qu'avant l'ajout des autres formes de pente)
+
+    memory = shared_memory.SharedMemory(create=True, size=max(size * len(METRICS) * 8, 1))
+    try:
+        metrics = np.ndarray((size, len(METRICS)), dtype=np.float64, buffer=memory.buf)
+        metrics[:] = np.nan
+        done = np.zeros(size, dtype=bool)
+        if checkpoint is not None:
+            savedMetrics, savedDone = loadCheckpoint(checkpoint, params, settings)
+            if savedMetrics is not None:
+                metrics[:], done[:] = savedMetrics, savedDone
+
+        #Morceaux pas encore calculés
+        tasks = [(memory.name, size, start, min(start + chunkSize, size), params[start:start+chunkSize], end, kwargs)
+                 for start in range(0, size, chunkSize) if not np.all(done[start:start+chunkSize])]
+        if progress is not None:
+            progress(int(np.sum(done)), size)
+
+        lastCheckpoint = time.monotonic()
+        pool = multiprocessing.Pool(processes) if processes != 1 and len(tasks) > 1 else None
+        try:
+            for (start, stop) in (pool.imap_unordered(sweepChunk, tasks) if pool is not None else map(sweepChunk, tasks)):
+                done[start:stop] = True
+                if progress is not None:
+                    progress(int(np.sum(done)), size)
+                if checkpoint is not None and time.monotonic() - lastCheckpoint > checkpointInterval:
+                    saveCheckpoint(checkpoint, params, metrics, done, settings)
+                    lastCheckpoint = time.monotonic()
+        finally:
+            if pool is not None:
+                pool.terminate()
+            if checkpoint is not None:
+                saveCheckpoint(checkpoint, params, metrics, done, settings)
+
+        results = metrics.copy()
+        del metrics #(La mémoire partagée ne peut pas être fermée tant qu'un tableau l'utilise)
+    finally:
+        memory.close()
+        memory.unlink()
+    return results
+
+
+if __name__ == "__main__":
+    grid = sweepGrid(m=0.382, k=np.linspace(0.05, 0.3, 26), kp=np.linspace(0, 0.5, 26), hp=1, lp=0.5)
+    results = sweep(grid, 20, checkpoint="sweep.npz", progress=lambda done, total: print(f"\r{done}/{total}", end=""))
+    print()
+    best = np.nanargmax(results[:, METRICS.index("stopDistance")])
+    print(f"Distance d'arrêt maximale : {results[best, 2]:.3f} m (k = {grid[best, 1]:.3f}, kp = {grid[best, 2]:.3f})")
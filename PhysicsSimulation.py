@@ -3,146 +3,188 @@
 
 from tkinter import *
 import tkinter.filedialog
+import copy
 import numpy as np
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
-import json
+import SettingsStore
 import os
+import SimulationCore
+import PlotTools
+import ResultStore
+import MonteCarlo
+import Profiling
+import StepSelection
+import SlopeProfiles
 
 step = 0.001 
 stepPente = 0.001
+groundEngine = "exact" #"exact" : solution exacte sur le sol ; "euler" : méthode d'Euler pas à pas
+slopeEngine = "segments" #"segments" : petites pentes rectilignes ; "mesh" : petites pentes rectilignes adaptées à la forme de la pente ; "adaptive" : intégration à pas adaptatif
+tolerance = None #Si donnée : step et stepPente sont choisis automatiquement pour que l'erreur estimée sur toleranceQuantity soit plus petite (voir StepSelection.py)
+toleranceQuantity = "exitSpeed" #"exitSpeed" : vitesse en fin de pente [m/s] ; "energy" : énergie en fin de pente [J] ; "stopDistance" : distance parcourue sur le sol [m]
+uncertainties = {"m": 0.001, "k": 0.02, "kp": 0.03, "hp": 0.005, "lp": 0.005} #Ecart-type des paramètres mesurés (bandes d'incertitude, option [MC])
+monteCarloSamples = 2000 #Nombre de simulations pour les bandes d'incertitude
+profileFit = None #Si donné (par exemple {"deg": 4} ou {"exp": True}), la pente chargée avec le bouton "Pente" est remplacée par la fonction la plus proche de ses points (voir CurveFitting.py)
+profiling = False #True : mesure le temps de chaque étape (calcul, graphiques, sauvegarde) et l'affiche en bas de la fenêtre
+profilingLog = None #Fichier où chaque mesure est ajoutée (une ligne JSON par mesure), par exemple "profiling.jsonl"
 
 
 def simulation():
     """Simule la position (x et y), la vitesse, l'accélération et l'énergie sur la pente et sur le sol
+        (au lancement du programme, ensuite les simulations sont faites par simulationWorker, voir requestSimulation())
     """
-    global t, x, v, a, y, e_cin, e_pot, e_tot, tExpTmp, xExpTmp, yExpTmp, vExpTmp, aExpTmp
-    k, m, h, w, kp, g, end = settings["k"], settings["m"], settings["hp"], settings["lp"], settings["kp"], settings["g"], settings["Fin"]
-
-    ## Simulation pente : 
-    # Découpage de la pente courbe en une multitude de petites pentes rectilignes
-    xPente = np.arange(-w, 0, stepPente)
-    yPente = h*np.e**((-3.5*xPente)/w-3.5) #La fonction la plus proche de notre pente
-    vxPente = np.zeros_like(xPente)
-    vyPente = np.zeros_like(xPente)
-    aPente = np.zeros_like(xPente)
-    tPente = np.zeros_like(xPente)
-
-    vf = 0
-    aPente[0] = g
-    angle = np.arctan((yPente[0] - yPente[1]) / (xPente[1] - xPente[0]))
-
-    for i in range(1, len(xPente)):
-        #Analyse du petit bout de pente (supposé droit) entre le dernier point et le point actuel
-        vi = vf #Vitesse précédente
-        dx = np.sqrt((xPente[i]-xPente[i-1])**2+(yPente[i]-yPente[i-1])**2) #Taille du petit bout de pente
-        aPente[i] = g * np.sin(angle) - (kp * vi) / m #Norme de l'accélération sur le petit bout de pente (y compris frottements)
-
-        #Résolution d'un MRUA sur le petit bout de pente
-        dt = (-vi + np.sqrt(2*aPente[i]*dx + vi**2)) / aPente[i]
-        vf = np.sqrt(2*aPente[i]*dx + vi**2)
-
-        tPente[i] = tPente[i-1] + dt
-
-        angle = 0 if i == len(xPente) - 1 else np.arctan((yPente[i] - yPente[i+1]) / (xPente[i+1] - xPente[i])) #Angle du prochain bout de pente
-
-        #Vitesse exprimée dans la direction du prochain bout de pente
-        vxPente[i] = vf * np.cos(angle)
-        vyPente[i] = - vf * np.sin(angle)
-    
-    ## Simulation x, v, a sur le sol
-    t = np.arange(0, end, step)
-    x = np.zeros_like(t)
-    v = np.zeros_like(t)
-    a = np.zeros_like(t)
-    y = np.zeros_like(t)
-
-    #Calcul de la position, vitesse et accélération à chaque instant (avec un dt très petit)
-    x[0] = 0
-    v[0] = vxPente[-1]
-    for i in range(len(t)-1):
-        dt = step
-
-        #Calcul du frottement et de l'accélération
-        f_frott = -k*v[i] #F = -kv
-        a[i] = f_frott/m #F = ma
-        
-        v[i+1] = v[i] + (a[i] * dt) #Ajout de l'accélération * dt à la vitesse
-        x[i+1] = x[i] + (v[i] * dt) #Ajout de la vitesse * dt à la position
-
-    #Rassembler les données de la pente et du sol
-    t = np.concatenate((-tPente[-1]+tPente, t))
-    x = np.concatenate((xPente, x))
-    y = np.concatenate((yPente, y))
-    v = np.concatenate((np.sqrt(vxPente**2+vyPente**2), v))
-    a = np.concatenate((aPente, a))
-
-    #Energie
-    e_pot = m * g * y
-    e_cin = m * v**2 / 2
-    e_tot = e_pot + e_cin
-    
-    
-    #(Donnees exp)
-    tExpTmp = [tExp[i] for i in range(len(tExp)) if tExp[i] <= settings["Fin"]]
-    xExpTmp = [xExp[i] for i in range(len(tExp)) if tExp[i] <= settings["Fin"]]
-    yExpTmp = [yExp[i] for i in range(len(tExp)) if tExp[i] <= settings["Fin"]]
-    vExpTmp = [vExp[i] for i in range(len(tExp)) if tExp[i] <= settings["Fin"]]
-    aExpTmp = [aExp[i] for i in range(len(tExp)) if tExp[i] <= settings["Fin"]]
+    showResult(*simulateSettings(settings))
 
+def simulateSettings(settings):
+    """Simule les paramètres donnés (fonction appelée par simulationWorker)
+        et, avec l'option [MC], calcule les bandes d'incertitude (voir MonteCarlo.monteCarlo())
 
-def createPlot(xValues, yValues, labels, subplotArgs, colors, ySymetry):
-    """Creates a plot with graphs with specified parameters
+    Args:
+        settings (dict): Les paramètres
+
+    Returns:
+        (SimulationResult, dict, dict): Les données de la simulation, Les bandes d'incertitude (None sans l'option [MC]),
+            Les paramètres de la simulation (pas et méthodes de calcul compris, écrits dans les exports .sim)
+    """
+    global lastUncertainty
+    (currentStep, currentStepPente) = simulationSteps(settings)
+    profile = settingsProfile(settings)
+    newResult = SimulationCore.simulateSettings(settings, simulationCache, step=currentStep, stepPente=currentStepPente, groundEngine=groundEngine, slopeEngine=slopeEngine, profile=profile)
+    params = {name: value for (name, value) in settings.items() if name != "options"}
+    params.update({"step": currentStep, "stepPente": currentStepPente, "groundEngine": groundEngine, "slopeEngine": slopeEngine})
+    if not settings["options"]["[MC]"]:
+        return newResult, None, params
+
+    #(Les bandes ne sont recalculées que si les paramètres ont changé)
+    key = tuple(settings[name] for name in ("m", "k", "kp", "hp", "lp", "g", "Fin")) + tuple(sorted(uncertainties.items())) + (profile,)
+    if lastUncertainty is None or lastUncertainty[0] != key:
+        lastUncertainty = (key, MonteCarlo.monteCarlo(settings["m"], settings["k"], settings["kp"], settings["hp"], settings["lp"], settings["g"], settings["Fin"], uncertainties, monteCarloSamples, channels=("x", "v", "a", "e_cin", "e_pot", "e_tot"), profile=profile))
+    return newResult, lastUncertainty[1], params
+
+def simulationSteps(settings):
+    """Renvoie les pas de la simulation : step et stepPente, ou ceux choisis par stepSelector si une précision est donnée (tolerance)
 
     Args:
-        xValues (list): A list of numpy arrays with x values
-        yValues (list): A list of numpy arrays with y values
-        labels (list): A list of strings with the names of the graphs
-        subplotArgs (tuple): A tuple containing the arguments for the figure.add_subplot() function
-        colors (tuple): A tuple of strings with the colors of the graphs
-        ySymetry (bool): Wether the y axis ticks must be symetrical or not
+        settings (dict): Les paramètres
+
+    Returns:
+        (float, float): step, stepPente
+    """
+    if stepSelector is None:
+        return step, stepPente
+    return stepSelector.choose(*(settings[name] for name in ("m", "k", "kp", "hp", "lp", "g", "Fin")), settingsProfile(settings)) #(Erreur estimée et temps gagné affichés par updateStatus())
+
+def settingsProfile(settings):
+    """Renvoie la forme de la pente : celle des points du fichier choisi avec le bouton "Pente" (voir SlopeProfiles.loadProfile()), ou la pente exponentielle
+
+    Args:
+        settings (dict): Les paramètres
 
     Returns:
-        object (matplotlib.axes._subplots.AxesSubplot): The plot
+        SlopeProfile: La forme de la pente (chargée une seule fois par fichier)
     """
-    #Create sub_plot
-    plot = figure.add_subplot(subplotArgs[0], subplotArgs[1], subplotArgs[2])
+    if settings["profile"] is None:
+        return SlopeProfiles.EXPONENTIAL
+    if settings["profile"] not in slopeProfiles:
+        slopeProfiles[settings["profile"]] = SlopeProfiles.loadProfile(settings["profile"], **(profileFit or {}))
+    return slopeProfiles[settings["profile"]]
+
+def showResult(newResult, newUncertainty=None, newParams=None):
+    """Garde le résultat d'une simulation pour les graphiques et l'export
 
-    #Create graphs
-    for i in range(len(labels)):
-        plot.plot(xValues[i], yValues[i], label=labels[i], color=colors[i])
+    Args:
+        newResult (SimulationResult): Les données de la simulation
+        newUncertainty (dict, optional): Les bandes d'incertitude (pas gardées sans l'option [MC]). Defaults to None.
+        newParams (dict, optional): Les paramètres de la simulation (voir simulateSettings()). Defaults to None (ceux du résultat déjà affiché).
+    """
+    global t, x, v, a, y, e_cin, e_pot, e_tot, tExpTmp, xExpTmp, yExpTmp, vExpTmp, aExpTmp, result, uncertainty, resultParams
+    result = newResult
+    uncertainty = newUncertainty if settings["options"]["[MC]"] else None #(Réponse à une demande faite avant d'enlever l'option [MC])
+    if newParams is not None:
+        resultParams = newParams
+    t, x, y, v, a = result.t, result.x, result.y, result.v, result.a
+    e_cin, e_pot, e_tot = result.e_cin, result.e_pot, result.e_tot
 
-    #Set ylim (better than by default)
-    max = np.amax(np.array([np.amax(array) for array in yValues]))
-    min = np.amin(np.array([np.amin(array) for array in yValues]))
-    if ySymetry:
-        absMax = abs(max) if abs(max) > abs(min) else abs(min)
-        max = absMax
-        min = -absMax
-    margin = abs(max - min) * 0.05
-    plot.set_ylim([min-margin, max+margin])
+    #(Donnees exp : vues des données jusqu'à Fin, recalculées seulement quand Fin change)
+    with Profiling.profiler.section("données exp"):
+        experimentalWindow = experimentalData.window(settings["Fin"])
+        tExpTmp, xExpTmp, yExpTmp, vExpTmp, aExpTmp = (experimentalWindow[name] for name in ("t", "x", "y", "v", "a"))
 
-    #Create y=0 and x=0 lines and a legend
-    plot.axhline(y=0, color="k", linewidth=1)
-    plot.axvline(x=0, color="k", linewidth=1)
-    plot.legend(loc="upper right")
 
-    return plot
+def updatePlots(layout, curves, ySymetry):
+    """Draws the graphs. The plots are only created again if the layout changed, else only the data of the graphs is replaced
+
+    Args:
+        layout (tuple): What is shown (type of graph, active options, experimental data or not)
+        curves (list): For each plot : (xValues, yValues, labels, colors, ylabel, bands) (see PlotTools.createPlot())
+        ySymetry (bool): Wether the y axis ticks must be symetrical or not
+    """
+    global plots, plotsLayout
+    if layout != plotsLayout:
+        with Profiling.profiler.section("création graphes"):
+            #Destroy plots
+            for plot in plots:
+                plot.remove()
+
+            #Create plots
+            plots = PlotTools.createPlots(figure, curves, ySymetry)
+            plotsLayout = layout
+            limitsChanged = True
+    else:
+        with Profiling.profiler.section("mise à jour graphes"):
+            #Replace the data of the graphs
+            limitsChanged = False
+            for (plot, (xValues, yValues, _, _, _, bands)) in zip(plots, curves):
+                for i in range(len(yValues)):
+                    plot.lines[i].decimatedLine.setData(xValues[i], yValues[i])
+                for collection in list(plot.collections):
+                    collection.remove()
+                PlotTools.createBands(plot, bands)
+                limitsChanged = PlotTools.setLimits(plot, *PlotTools.bandLimits(xValues, yValues, bands), ySymetry) or limitsChanged
+
+    #Update canvas (only the graphs if the axes did not change)
+    if limitsChanged or background is None:
+        canvas.draw_idle()
+        toolbar.update()
+    else:
+        with Profiling.profiler.section("dessin"):
+            canvas.restore_region(background)
+            PlotTools.drawAnimated(plots)
+            canvas.blit(figure.bbox)
+        updateStatus()
+
+
+def onDraw(event):
+    """Executed after each full draw of the figure : saves the background (everything except the graphs) and draws the graphs
+    """
+    global background
+    background = canvas.copy_from_bbox(figure.bbox)
+    PlotTools.drawAnimated(plots)
+    if profiling or stepSelector is not None:
+        window.after_idle(updateStatus) #(After the end of the draw, which is measured too)
+
+
+def updateStatus():
+    """Shows in the status line the chosen steps with their estimated error and time saved (if a tolerance is given)
+        and the last duration of each step (if profiling is True)
+    """
+    lines = []
+    if stepSelector is not None and stepSelector.lastReport is not None:
+        lines.append(stepSelector.lastReport["text"])
+    if profiling:
+        lines.append(Profiling.profiler.summary(("pente", "sol", "énergie", "données exp", "création graphes", "mise à jour graphes", "dessin", "sauvegarde")))
+    statusLabel.config(text="\n".join(lines))
 
 
 def plotMovement(recalculate=True):
     """Draws the graphs for x, v, t
     """
-    global plots, currentGraph
+    global currentGraph
     if recalculate:
         currentGraph = "movement"
         updateCheckbuttons((("x(t)", "v(t)"), ("a(t)", "y(t)")))
 
-    #Destroy plots
-    for plot in plots:
-        plot.remove()
-    plots = []
-    
     #Create plots
     activeOptions = []
     for option in ("x(t)", "v(t)", "a(t)", "y(t)"):
@@ -152,32 +194,25 @@ def plotMovement(recalculate=True):
         params = {"x(t)": (x, "blue", xExpTmp, "orange", "x[s]"), "v(t)": (v, "red", vExpTmp, "orange", "v[m/s]"), "a(t)": (a, "green", aExpTmp, "orange", "a[m/s²]"), "y(t)": (y, "blue", yExpTmp, "orange", "y[m]")}
     else:
         params = {"x(t)": (x, "blue", "x[s]"), "v(t)": (v, "red", "v[m/s]"), "a(t)": (a, "green", "a[m/s²]"), "y(t)": (y, "blue", "y[m]")}
+    curves = []
     for i in range(len(activeOptions)):
+        bands = PlotTools.uncertaintyBands(uncertainty, ((activeOptions[i], activeOptions[i][0], params[activeOptions[i]][1]),))
         if len(params[activeOptions[i]]) > 3:
-            plot = createPlot([t, tExpTmp], [params[activeOptions[i]][0], params[activeOptions[i]][2]], [activeOptions[i], activeOptions[i] + " Exp"], (len(activeOptions), 1, i+1), [params[activeOptions[i]][1], params[activeOptions[i]][3]], True)
+            curves.append(([t, tExpTmp], [params[activeOptions[i]][0], params[activeOptions[i]][2]], [activeOptions[i], activeOptions[i] + " Exp"], [params[activeOptions[i]][1], params[activeOptions[i]][3]], params[activeOptions[i]][-1], bands))
         else:
-            plot = createPlot([t], [params[activeOptions[i]][0]], [activeOptions[i]], (len(activeOptions), 1, i+1), [params[activeOptions[i]][1]], True)
-        plot.set_ylabel(params[activeOptions[i]][-1])
-        plots.append(plot)
+            curves.append(([t], [params[activeOptions[i]][0]], [activeOptions[i]], [params[activeOptions[i]][1]], params[activeOptions[i]][-1], bands))
 
-    #Update canvas
-    canvas.draw_idle()
-    toolbar.update()
+    updatePlots(("movement", tuple(activeOptions), settings["options"]["[Exp]"], uncertainty is not None), curves, True)
 
 
 def plotEnergy(recalculate=True):
     """Draws the graphs for the energy
     """
-    global plots, currentGraph
+    global currentGraph
     if recalculate:
         currentGraph = "energy"
         updateCheckbuttons((("Ec(t)", "Ep(t)"), ("Et(t)",)))
 
-    #Destroy plots
-    for plot in plots:
-        plot.remove()
-    plots = []
-
     #Create plot with the 3 graphs
     params = {"Ec(t)": (e_cin, "red"), "Ep(t)": (e_pot, "blue"), "Et(t)": (e_tot, "green")}
     activeOptions = []
@@ -188,42 +223,36 @@ def plotEnergy(recalculate=True):
             activeOptions.append(option)
             yValues.append(params[option][0])
             colors.append(params[option][1])
-    
-    plot = createPlot([t] * len(yValues), yValues, activeOptions, (1, 1, 1), colors, False)
-    plot.set_ylabel("E[J]")
-    plots.append(plot)
 
-    #Update canvas
-    canvas.draw_idle()
-    toolbar.update()
-    
+    bands = PlotTools.uncertaintyBands(uncertainty, [(option, {"Ec(t)": "e_cin", "Ep(t)": "e_pot", "Et(t)": "e_tot"}[option], params[option][1]) for option in activeOptions])
+    updatePlots(("energy", tuple(activeOptions), uncertainty is not None), [([t] * len(yValues), yValues, activeOptions, colors, "E[J]", bands)], False)
+
 
 def load(dictionary):
-    """Tries to load settings3.json. If it doesn't exist, create it with the default settings.
+    """Tries to load settings.json. If it doesn't exist, create it with the default settings.
 
     Args:
         dictionary (dict): The default settings
 
     Returns:
-        dict: The dictionary contained in settings3.json if it existed. Else, the default settings.
+        dict: The dictionary contained in settings.json if it existed. Else, the default settings.
     """
-    filename = "settings.json"
-    try:
-        with open(filename, "r") as f:
-            dictionary = json.loads(f.read())
-    except FileNotFoundError:
-        save(dictionary)
-    return dictionary
+    return settingsStore.load(dictionary)
 
 def save(dictionary):
-    """Saves current settings in settings3.json
+    """Saves current settings in settings.json (the file is written a short time after the last change, see SettingsStore)
 
     Args:
         dictionary (dict): The settings to save
     """
-    filename = "settings.json"
-    with open(filename, "w") as f:
-        f.write(json.dumps(dictionary, indent=4))
+    with Profiling.profiler.section("sauvegarde"):
+        settingsStore.save(dictionary)
+
+def close():
+    """Writes the settings which are waiting and closes the window
+    """
+    settingsStore.close()
+    window.destroy()
 
 
 def updateCheckbuttons(options):
@@ -255,6 +284,38 @@ def clearEntry(id):
     """
     settingsEntries[id].delete(0, END)
 
+def requestSimulation():
+    """Demande une nouvelle simulation avec les paramètres actuels à simulationWorker (la fenêtre reste utilisable pendant le calcul)
+    """
+    global polling
+    simulationWorker.submit(copy.deepcopy(settings)) #(simulationWorker ne doit pas lire les options pendant qu'elles changent)
+    busyLabel.config(text="Calcul en cours...")
+    if not polling:
+        polling = True
+        window.after(20, pollSimulation)
+
+def pollSimulation():
+    """Vérifie si simulationWorker a fini la dernière simulation demandée et met les graphiques à jour
+        (les résultats des demandes remplacées par une plus récente ne sont jamais affichés)
+    """
+    global polling
+    answer = simulationWorker.poll()
+    if answer is not None:
+        (newResult, error) = answer
+        if error is None:
+            showResult(*newResult)
+            if currentGraph == "movement":
+                plotMovement()
+            else:
+                plotEnergy()
+        else:
+            print("Error: the simulation failed (" + repr(error) + ").")
+    if simulationWorker.busy():
+        window.after(20, pollSimulation)
+    else:
+        polling = False
+        busyLabel.config(text="")
+
 def replot(id):
     """Plot the graphs again when an entry's value changed
 
@@ -267,11 +328,7 @@ def replot(id):
     except:
         newValue = float(newValue)
     settings[list(settings.keys())[id]] = newValue
-    simulation()
-    if currentGraph == "movement":
-        plotMovement()
-    else:
-        plotEnergy()
+    requestSimulation()
     save(settings)
     window.focus_set()
 
@@ -279,17 +336,14 @@ def resetSettings():
     """Reset settings to default
     """
     global settings
-    settings = defaultSettings
+    settings = copy.deepcopy(defaultSettings)
     settingNames = list(settings.keys())
     settingNames.remove("options")
+    settingNames.remove("profile")
     for i in range(len(settingNames)):
         settingsEntries[i].delete(0, END)
         settingsEntries[i].insert(0, str(settings[settingNames[i]]))
-    simulation()
-    if currentGraph == "movement":
-        plotMovement()
-    else:
-        plotEnergy()
+    requestSimulation()
     save(settings)
 
 def updateActiveGraphs(id):
@@ -300,6 +354,11 @@ def updateActiveGraphs(id):
     """
     if id == -1:
         settings["options"]["[Exp]"] = False if experimentalButtonValue.get() == 0 else True
+    elif id == -2:
+        settings["options"]["[MC]"] = False if uncertaintyButtonValue.get() == 0 else True
+        if not settings["options"]["[MC]"]:
+            showResult(result) #(The bands disappear now, without waiting for simulationWorker)
+        requestSimulation() #(The bands are computed by simulationWorker ; replaces a request which would compute them)
     else: 
         settings["options"][checkButtons[id].cget("text")] = False if checkButtonsValues[id].get() == 0 else True
     if currentGraph == "movement":
@@ -308,36 +367,80 @@ def updateActiveGraphs(id):
         plotEnergy(False)
     save(settings)
 
+def chooseProfile():
+    """Asks the user to choose a file of measured points of the slope (columns x and y [m]) and simulates this slope
+        (hp and lp are set to the height and the width of the measured slope ; Reset goes back to the exponential slope)
+    """
+    filename = tkinter.filedialog.askopenfilename(initialdir=os.getcwd(), filetypes=(("Text files", "*.txt"), ("All files", "*")))
+    if filename == "":
+        return
+    try:
+        profile = settingsProfile({"profile": filename})
+    except (OSError, ValueError) as error:
+        print("Error: the slope could not be loaded (" + repr(error) + ").")
+        return
+    settings["profile"] = filename
+    settingNames = [name for name in settings if name not in ("options", "profile")]
+    for (name, value) in zip(("hp", "lp"), profile.size):
+        settings[name] = round(float(value), 4)
+        settingsEntries[settingNames.index(name)].delete(0, END)
+        settingsEntries[settingNames.index(name)].insert(0, str(settings[name]))
+    requestSimulation()
+    save(settings)
+
 def export():
-    """Asks the user to choose a file to export the theoretical data to
+    """Asks the user to choose a file to export the theoretical data to (text file with t, x, y, v, a or binary .sim file with all the data and the settings)
     """
-    filename = tkinter.filedialog.asksaveasfilename(initialdir=os.getcwd(), defaultextension=".txt", filetypes=(("Text files", "*.txt"),))
+    filename = tkinter.filedialog.asksaveasfilename(initialdir=os.getcwd(), defaultextension=".txt", filetypes=(("Text files", "*.txt"), ("Binary files", "*.sim")))
     if filename != "":
+        if filename.endswith(".sim"):
+            SimulationCore.exportBinary(filename, result, resultParams) #(Paramètres du résultat affiché, pas forcément les paramètres actuels)
+            return
         if not filename.endswith(".txt"):
             filename += ".txt"
         np.savetxt(filename, np.array((t, x, y, v, a)).T)
 
 #Get settings and declare simulation variables
-defaultSettings = {"m": 0.5, "k": 0.22, "kp": 0, "Fin": 20, "hp": 1, "lp": 0.55, "g": 9.81, "options": {"[Exp]": False, "x(t)": True, "v(t)": True, "a(t)": True, "y(t)": False, "Ec(t)": True, "Ep(t)": True, "Et(t)": True}}
-settings = load(defaultSettings)
+defaultSettings = {"m": 0.5, "k": 0.22, "kp": 0, "Fin": 20, "hp": 1, "lp": 0.55, "g": 9.81, "options": {"[Exp]": False, "[MC]": False, "x(t)": True, "v(t)": True, "a(t)": True, "y(t)": False, "Ec(t)": True, "Ep(t)": True, "Et(t)": True}, "profile": None}
+settingsStore = SettingsStore.SettingsStore("settings.json")
+settings = load(copy.deepcopy(defaultSettings)) #(Copy : changing the settings must not change the defaults)
+settings["options"].setdefault("[MC]", False) #(Settings saved before the uncertainty bands existed)
+settings.setdefault("profile", None) #(File of measured points of the slope, see chooseProfile() ; None : exponential slope)
 t, x, v, a, y, e_cin, e_pot, e_tot = None, None, None, None, None, None, None, None
+result = None
+resultParams = None #Parameters of result (see simulateSettings())
+uncertainty = None #Uncertainty bands (see MonteCarlo.monteCarlo(), None without the option [MC])
+lastUncertainty = None #Last computed bands and their parameters (only used by simulationWorker)
+stepSelector = StepSelection.StepSelector(tolerance, toleranceQuantity, groundEngine, slopeEngine, timeReport=profiling) if tolerance is not None else None #Pas choisis pour chaque domaine de paramètres
+resultStore = ResultStore.ResultStore(simulator=SimulationCore.IncrementalSimulation().simulate) #Résultats gardés sur le disque d'un lancement à l'autre (sinon seule la partie modifiée est recalculée)
+simulationCache = SimulationCore.SimulationCache(maxSize=64, simulator=resultStore.simulate) #Derniers résultats (revenir à des paramètres déjà essayés ne relance pas la simulation)
+simulationWorker = SimulationCore.SimulationWorker(simulator=simulateSettings) #Simulations faites en arrière-plan (seul simulationWorker utilise simulationCache après le lancement)
+polling = False #True while pollSimulation() is scheduled
+slopeProfiles = {} #Slopes already loaded (see settingsProfile())
+if settings["profile"] is not None and not os.path.exists(settings["profile"]):
+    print("Error: " + settings["profile"] + " is missing (exponential slope used).")
+    settings["profile"] = None
 
 #Read experimental data
 #(Experimental data were taken with tracker with those parameters : m=0.382, l=0.5, h=1, g=9.81, kp=0.3, k=0.1)
 #(^Try the program with those settings, it looks perfect :) )
 try:
-    (tExp, xExp, yExp, vExp, aExp) = np.loadtxt("experimentalData.txt").T
+    experimentalData = SimulationCore.loadExperimentalData("experimentalData.txt")
 except FileNotFoundError:
     print("Error: experimentalData.txt is missing.")
-    tExp, xExp, yExp, vExp, aExp = np.array((0,)), np.array((0,)), np.array((0,)), np.array((0,)), np.array((0,))
+    experimentalData = SimulationCore.ExperimentalData(np.array((0,)), np.array((0,)), np.array((0,)), np.array((0,)), np.array((0,)))
 tExpTmp, xExpTmp, yExpTmp, vExpTmp, aExpTmp = None, None, None, None, None
 
+if profiling:
+    Profiling.profiler.enable(profilingLog)
 simulation() #Simulate
 
 #Setting window and buttons
 window = Tk()
 window.title("Simulation physique")
-window.geometry("800x610")
+window.geometry("800x630" if profiling else "800x610")
+settingsStore.setScheduler(window) #(Settings are written a short time after the last change)
+window.protocol("WM_DELETE_WINDOW", close)
 
 #Setting up bar (buttons)
 plotMovementButton = Button(window, command=plotMovement, text="Mouvement", bd=3, font=("Calibri", 12, "bold"), background="blue", activebackground="dark blue")
@@ -346,9 +449,16 @@ plotEnergyButton = Button(window, command=plotEnergy, text="Energie", bd=3, font
 plotEnergyButton.place(x=310, y=30, anchor="w")
 experimentalButtonValue = IntVar()
 experimentalButton = Checkbutton(window, command=lambda: updateActiveGraphs(-1), text="Données exp.", font=("Calibri", 12, "bold"), variable=experimentalButtonValue)
-experimentalButton.place(x=7, y=30, anchor="w")
+experimentalButton.place(x=7, y=15, anchor="w")
 if settings["options"]["[Exp]"]:
     experimentalButtonValue.set(1)
+uncertaintyButtonValue = IntVar()
+uncertaintyButton = Checkbutton(window, command=lambda: updateActiveGraphs(-2), text="Incertitudes", font=("Calibri", 12, "bold"), variable=uncertaintyButtonValue)
+uncertaintyButton.place(x=7, y=43, anchor="w")
+if settings["options"]["[MC]"]:
+    uncertaintyButtonValue.set(1)
+busyLabel = Label(window, text="", font=("Calibri", 12, "bold"))
+busyLabel.place(x=703, y=30, anchor=CENTER)
 checkButtons = []
 checkButtonsValues = []
 
@@ -357,10 +467,12 @@ settingsFrame = Frame(width=180, height=504, bd=2, relief=RIDGE)
 settingsFrame.place(x=703, y=309, anchor=CENTER)
 Label(settingsFrame, text="Paramètres :", font=("Calibri", 18, "bold")).place(x=8, y=20, anchor="w")
 Button(settingsFrame, text="Reset", command=resetSettings, bd=3, background="red", activebackground= "dark red", font=("Calibri", 12, "bold")).place(x=8, y=480, anchor="w")
+Button(settingsFrame, text="Pente", command=chooseProfile, bd=3, background="orange", activebackground= "dark orange", font=("Calibri", 12, "bold")).place(x=90, y=440, anchor=CENTER)
 Button(settingsFrame, text="Exporter", command=export, bd=3, background="yellow", activebackground= "gold", font=("Calibri", 12, "bold")).place(x=172, y=480, anchor="e")
 settingsEntries = []
 settingNames = list(settings.keys())
 settingNames.remove("options")
+settingNames.remove("profile")
 settingsUnits = {"m": "[kg]", "k": "[kg/s]", "kp": "[kg/s]", "Fin": "[s]", "hp": "[m]", "lp": "[m]", "g": "[m/s²]"}
 for i in range(len(settingNames)):
     l = Label(settingsFrame, text=settingNames[i] + " = ", font=("Calibri", 15, "bold"))
@@ -378,10 +490,19 @@ figure = Figure(figsize = (6, 5), dpi = 100)
 figure.subplots_adjust(top=0.95, bottom=0.12, left=0.12, right=0.95, hspace=0.5)
 figure.supxlabel("t[s] ; t=0 : fin de la pente")
 plots = []
+plotsLayout = None #What the plots show (see updatePlots())
+background = None #The figure without the graphs (see onDraw())
 
 canvas = FigureCanvasTkAgg(figure)
 canvas.get_tk_widget().configure(bd=2, relief=GROOVE)
 canvas.get_tk_widget().place(x=307, y=310, anchor=CENTER)
+canvas.mpl_connect("draw_event", onDraw)
+
+statusLabel = Label(window, text="", font=("Calibri", 10)) #Chosen steps and duration of each step (see updateStatus())
+if profiling or stepSelector is not None:
+    statusLabel.pack(side=BOTTOM)
+if profiling:
+    canvas.draw = Profiling.profiler.wrap("dessin", canvas.draw) #(Also measures the draws asked by draw_idle() and the toolbar)
 
 toolbar = NavigationToolbar2Tk(canvas, window)
 toolbar.update()
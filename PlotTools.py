@@ -0,0 +1,238 @@
+#Equipe 1155
+#PlotTools : Outils pour les graphiques Matplotlib (réduction du nombre de points affichés, création et dessin des graphiques de la simulation), utilisés par PhysicsSimulation, DataComparison et Benchmarks
+
+import numpy as np
+
+
+def minMaxDecimate(x, y, buckets):
+    """Reduces a curve to the min and max points of each bucket (the shape and the peaks of the curve are kept)
+
+    Args:
+        x (numpy.ndarray): The x values
+        y (numpy.ndarray): The y values
+        buckets (int): The number of buckets (about the number of pixels available)
+
+    Returns:
+        (numpy.ndarray, numpy.ndarray): The x and y values of the kept points (at most 2*buckets+2 points, in their original order)
+    """
+    size = len(x)
+    if size <= 2 * buckets + 2:
+        return x, y
+
+    #Cut the curve in buckets of the same size (the last one is padded with its last point)
+    bucketSize = -(-size // buckets)
+    padded = np.concatenate((y, np.full(buckets * bucketSize - size, y[-1])))
+    padded = padded.reshape(buckets, bucketSize)
+    start = np.arange(buckets) * bucketSize
+
+    #Keep the first point, the min and the max of each bucket and the last point
+    indexes = np.concatenate(((0,), start + np.argmin(padded, axis=1), start + np.argmax(padded, axis=1), (size-1,)))
+    indexes = np.unique(np.minimum(indexes, size-1))
+    return x[indexes], y[indexes]
+
+
+class DecimatedLine:
+    """A line of a plot which only draws about as many points as there are pixels,
+        and computes them again (from all the data) when the user zooms or moves with the toolbar"""
+
+    def __init__(self, plot, x, y, **kwargs):
+        """Creates the line
+
+        Args:
+            plot (matplotlib.axes.Axes): The plot
+            x (numpy.ndarray): The x values
+            y (numpy.ndarray): The y values
+            **kwargs : The arguments for plot.plot() (label, color, ...)
+        """
+        self.plot = plot
+        self.line = plot.plot([], [], **kwargs)[0]
+        self.line.decimatedLine = self #(Matplotlib only keeps weak references to the callbacks)
+        self.setData(x, y)
+        plot.update_datalim(np.column_stack((self.x, self.y))) #(For the autoscale : the limits must contain all the data)
+        plot.autoscale_view()
+        plot.callbacks.connect("xlim_changed", self.onZoom)
+
+    def setData(self, x, y):
+        """Replaces the data of the line
+
+        Args:
+            x (numpy.ndarray): The x values
+            y (numpy.ndarray): The y values
+        """
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+        self.sorted = len(self.x) < 2 or bool(np.all(np.diff(self.x) >= 0))
+        self.update(self.x[0] if len(self.x) > 0 else 0, self.x[-1] if len(self.x) > 0 else 0)
+
+    def update(self, xMin, xMax):
+        """Computes the points to draw for the given x interval
+
+        Args:
+            xMin (float): The lower bound of the interval
+            xMax (float): The upper bound of the interval
+        """
+        if self.sorted:
+            #Visible points (and one more point on each side so that the line reaches the borders)
+            first = max(np.searchsorted(self.x, xMin, side="left") - 1, 0)
+            last = min(np.searchsorted(self.x, xMax, side="right") + 1, len(self.x))
+            x, y = self.x[first:last], self.y[first:last]
+        else:
+            x, y = self.x, self.y
+        width = self.plot.bbox.width if self.plot.figure is not None else 600
+        self.line.set_data(*minMaxDecimate(x, y, max(int(width), 1)))
+
+    def onZoom(self, plot):
+        """Executed when the x limits of the plot change (zoom, move, autoscale)
+
+        Args:
+            plot (matplotlib.axes.Axes): The plot
+        """
+        self.update(*sorted(plot.get_xlim()))
+
+
+def createPlot(figure, xValues, yValues, labels, subplotArgs, colors, ySymetry, bands=()):
+    """Creates a plot with graphs with specified parameters (used by PhysicsSimulation and Benchmarks)
+
+    Args:
+        figure (matplotlib.figure.Figure): The figure
+        xValues (list): A list of numpy arrays with x values
+        yValues (list): A list of numpy arrays with y values
+        labels (list): A list of strings with the names of the graphs
+        subplotArgs (tuple): A tuple containing the arguments for the figure.add_subplot() function
+        colors (tuple): A tuple of strings with the colors of the graphs
+        ySymetry (bool): Wether the y axis ticks must be symetrical or not
+        bands (list, optional): The uncertainty bands : (xValues, lower values, upper values, label, color) for each band. Defaults to ().
+
+    Returns:
+        object (matplotlib.axes._subplots.AxesSubplot): The plot
+    """
+    #Create sub_plot
+    plot = figure.add_subplot(subplotArgs[0], subplotArgs[1], subplotArgs[2])
+
+    #Create graphs (animated : they are drawn over the saved background, see drawAnimated())
+    for i in range(len(labels)):
+        DecimatedLine(plot, xValues[i], yValues[i], label=labels[i], color=colors[i], animated=True) #(Only about as many points as pixels)
+    createBands(plot, bands)
+
+    #Set xlim and ylim (better than by default)
+    setLimits(plot, *bandLimits(xValues, yValues, bands), ySymetry, True)
+
+    #Create y=0 and x=0 lines and a legend
+    plot.axhline(y=0, color="k", linewidth=1)
+    plot.axvline(x=0, color="k", linewidth=1)
+    plot.legend(loc="upper right")
+
+    return plot
+
+
+def createBands(plot, bands):
+    """Draws the uncertainty bands of a plot (animated, like the graphs), behind the graphs
+
+    Args:
+        plot (matplotlib.axes.Axes): The plot
+        bands (list): (xValues, lower values, upper values, label, color) for each band
+    """
+    for (xBand, lower, upper, label, color) in bands:
+        plot.fill_between(xBand, lower, upper, color=color, alpha=0.25, linewidth=0, label=label, animated=True, zorder=1)
+
+
+def bandLimits(xValues, yValues, bands):
+    """Adds the uncertainty bands to the values used for the limits of a plot
+
+    Args:
+        xValues (list): A list of numpy arrays with x values
+        yValues (list): A list of numpy arrays with y values
+        bands (list): (xValues, lower values, upper values, label, color) for each band
+
+    Returns:
+        (list, list): The x values and the y values
+    """
+    xValues, yValues = list(xValues), list(yValues)
+    for (xBand, lower, upper, _, _) in bands:
+        valid = ~np.isnan(lower) & ~np.isnan(upper)
+        xValues += [xBand[valid]] * 2
+        yValues += [lower[valid], upper[valid]]
+    return xValues, yValues
+
+
+def setLimits(plot, xValues, yValues, ySymetry, force=False):
+    """Sets the x and y limits of a plot so that all graphs are visible.
+        The limits are only changed if the graphs go out of them or use less than 80% of them (unless force is True)
+
+    Args:
+        plot (matplotlib.axes.Axes): The plot
+        xValues (list): A list of numpy arrays with x values
+        yValues (list): A list of numpy arrays with y values
+        ySymetry (bool): Wether the y axis ticks must be symetrical or not
+        force (bool, optional): Always set the limits. Defaults to False.
+
+    Returns:
+        bool: Wether the limits were changed or not
+    """
+    limits = []
+    for (values, symetry) in ((xValues, False), (yValues, ySymetry)):
+        max = np.amax(np.array([np.amax(array) for array in values]))
+        min = np.amin(np.array([np.amin(array) for array in values]))
+        if symetry:
+            absMax = abs(max) if abs(max) > abs(min) else abs(min)
+            max = absMax
+            min = -absMax
+        margin = abs(max - min) * 0.05
+        limits.append((min, max, margin))
+
+    changed = False
+    for (current, (min, max, margin), setter) in ((plot.get_xlim(), limits[0], plot.set_xlim), (plot.get_ylim(), limits[1], plot.set_ylim)):
+        if force or min < current[0] or max > current[1] or (max - min + 2*margin) < 0.8 * (current[1] - current[0]):
+            setter([min-margin, max+margin])
+            changed = True
+    return changed
+
+
+def createPlots(figure, curves, ySymetry):
+    """Creates one plot per curve group, one above the other (see createPlot())
+
+    Args:
+        figure (matplotlib.figure.Figure): The figure
+        curves (list): For each plot : (xValues, yValues, labels, colors, ylabel, bands) (see createPlot())
+        ySymetry (bool): Wether the y axis ticks must be symetrical or not
+
+    Returns:
+        list: The plots
+    """
+    plots = []
+    for i in range(len(curves)):
+        (xValues, yValues, labels, colors, ylabel, bands) = curves[i]
+        plot = createPlot(figure, xValues, yValues, labels, (len(curves), 1, i+1), colors, ySymetry, bands)
+        plot.set_ylabel(ylabel)
+        plots.append(plot)
+    return plots
+
+
+def drawAnimated(plots):
+    """Draws the graphs (animated lines and uncertainty bands) of some plots on their canvas
+        (after a full draw of the figure, which does not draw them)
+
+    Args:
+        plots (list): The plots
+    """
+    for plot in plots:
+        for line in list(plot.collections) + list(plot.lines):
+            if line.get_animated():
+                plot.draw_artist(line)
+
+
+def uncertaintyBands(uncertainty, graphs):
+    """Returns the uncertainty bands (between the first and the last percentile) of some graphs
+
+    Args:
+        uncertainty (dict): The result of MonteCarlo.monteCarlo(), or None (no bands)
+        graphs (iterable): (label, channel (see MonteCarlo.monteCarlo()), color) for each graph
+
+    Returns:
+        list: (xValues, lower values, upper values, label, color) for each band (see createPlot())
+    """
+    if uncertainty is None:
+        return []
+    percentiles = uncertainty["percentiles"]
+    return [(uncertainty["t"], uncertainty["bands"][channel][0], uncertainty["bands"][channel][-1], f"{label} {percentiles[-1] - percentiles[0]}%", color)
+            for (label, channel, color) in graphs if channel in uncertainty["bands"]]
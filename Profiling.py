@@ -0,0 +1,128 @@
+#Equipe 1155
+#Profiling : Mesure le temps de chaque étape des calculs et des graphiques (affiché par PhysicsSimulation, et éventuellement enregistré dans un fichier)
+
+import contextlib
+import json
+import threading
+import time
+
+NO_SECTION = contextlib.nullcontext() #(Utilisé quand les mesures sont désactivées : ne coûte presque rien)
+
+
+class Section:
+    """Une étape mesurée (à utiliser avec "with")"""
+
+    def __init__(self, profiler, name):
+        """Prépare la mesure
+
+        Args:
+            profiler (Profiler): Le profileur qui garde la mesure
+            name (str): Le nom de l'étape
+        """
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exception):
+        self.profiler.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Profiler:
+    """Temps et nombre d'exécutions de chaque étape (désactivé par défaut)"""
+
+    def __init__(self):
+        """Initialise le profileur (désactivé, aucune mesure)
+        """
+        self.enabled = False
+        self.log = None #Fichier où chaque mesure est écrite (une ligne JSON par mesure)
+        self.lock = threading.Lock() #(Les simulations sont mesurées dans un autre thread que les graphiques)
+        self.reset()
+
+    def enable(self, logFile=None):
+        """Active les mesures
+
+        Args:
+            logFile (str, optional): Le fichier où chaque mesure est ajoutée (une ligne JSON par mesure). Defaults to None.
+        """
+        self.disable()
+        if logFile is not None:
+            self.log = open(logFile, "a", buffering=1, encoding="utf-8")
+        self.enabled = True
+
+    def disable(self):
+        """Désactive les mesures (et ferme le fichier des mesures)
+        """
+        self.enabled = False
+        with self.lock:
+            if self.log is not None:
+                self.log.close()
+                self.log = None
+
+    def reset(self):
+        """Oublie toutes les mesures
+        """
+        self.last = {} #Durée de la dernière exécution de chaque étape [s]
+        self.total = {} #Durée totale de chaque étape [s]
+        self.count = {} #Nombre d'exécutions de chaque étape
+
+    def section(self, name):
+        """Mesure une étape : with profiler.section("nom"): ...
+
+        Args:
+            name (str): Le nom de l'étape
+
+        Returns:
+            Section: La mesure (ou un contexte vide si les mesures sont désactivées)
+        """
+        if not self.enabled:
+            return NO_SECTION
+        return Section(self, name)
+
+    def wrap(self, name, function):
+        """Renvoie une fonction qui appelle function en mesurant chaque appel
+
+        Args:
+            name (str): Le nom de l'étape
+            function (function): La fonction
+
+        Returns:
+            function: La fonction mesurée
+        """
+        def wrapper(*args, **kwargs):
+            with self.section(name):
+                return function(*args, **kwargs)
+        return wrapper
+
+    def record(self, name, duration):
+        """Ajoute une mesure
+
+        Args:
+            name (str): Le nom de l'étape
+            duration (float): La durée [s]
+        """
+        with self.lock:
+            self.last[name] = duration
+            self.total[name] = self.total.get(name, 0) + duration
+            self.count[name] = self.count.get(name, 0) + 1
+            if self.log is not None:
+                self.log.write(json.dumps({"time": time.time(), "section": name, "duration": duration, "count": self.count[name], "thread": threading.current_thread().name}, ensure_ascii=False) + "\n")
+
+    def summary(self, names=None):
+        """Décrit la dernière durée de chaque étape en une ligne
+
+        Args:
+            names (list, optional): Les étapes à décrire, dans l'ordre. Defaults to None (toutes, dans l'ordre de leur première mesure).
+
+        Returns:
+            str: La description ("pente 3.1 ms | sol 0.2 ms | ...")
+        """
+        with self.lock:
+            names = list(self.last) if names is None else [name for name in names if name in self.last]
+            return " | ".join(f"{name} {self.last[name]*1000:.1f} ms" for name in names)
+
+
+profiler = Profiler() #Profileur utilisé par tous les modules
@@ -0,0 +1,167 @@
+#Equipe 1155
+#ResultStore : Garde les résultats des simulations sur le disque pour les réutiliser d'un lancement à l'autre (PhysicsSimulation, FrictionCoefficientsFinder, DataComparison)
+
+import hashlib
+import os
+import time
+import FileTools
+import SimulationCore
+
+
+class ResultStore:
+    """Dossier de résultats de simulation : un fichier .npz compressé par simulation, nommé d'après ses paramètres et la version du calcul.
+        Chaque fichier contient aussi ses paramètres (voir SimulationCore.loadResult()).
+        Plusieurs programmes peuvent utiliser le même dossier en même temps : les fichiers sont écrits à part puis renommés (os.replace),
+        on ne lit donc jamais un fichier à moitié écrit."""
+
+    EVICT_TO = 0.9 #Fraction de maxBytes gardée après un nettoyage (de la place pour les prochains résultats sans reparcourir le dossier)
+    SCAN_EVERY = 100 #Nombre d'enregistrements entre deux parcours du dossier (pour compter les fichiers écrits par les autres programmes)
+
+    def __init__(self, directory="simulationResults", maxBytes=200*2**20, simulator=SimulationCore.simulate):
+        """Initialise le dossier de résultats
+
+        Args:
+            directory (str, optional): Le dossier. Defaults to "simulationResults".
+            maxBytes (int, optional): La taille maximale du dossier [octets] (les résultats utilisés le moins récemment sont supprimés). Defaults to 200 Mo.
+            simulator (function, optional): La fonction appelée quand le résultat n'est pas sur le disque (mêmes arguments que SimulationCore.simulate()). Defaults to SimulationCore.simulate.
+        """
+        self.directory = directory
+        self.maxBytes = maxBytes
+        self.simulator = simulator
+        self.hits = 0
+        self.misses = 0
+        self.size = None #Taille du dossier [octets], tenue à jour à chaque enregistrement (None : pas encore calculée, voir evict())
+        self.savesSinceScan = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, m, k, kp, hp, lp, g, end, **kwargs):
+        """Calcule le nom du fichier d'une simulation (empreinte de ses paramètres et de la version du calcul)
+
+        Args:
+            m, k, kp, hp, lp, g, end (float): Les paramètres physiques (voir SimulationCore.simulate())
+            **kwargs : Les autres arguments de SimulationCore.simulate()
+
+        Returns:
+            str: La clé
+
+        Raises:
+            ValueError: Si la forme de la pente n'a pas de clé donnée (voir SlopeProfiles.SlopeProfile)
+        """
+        profile = kwargs.get("profile")
+        if profile is not None and not profile.persistent:
+            raise ValueError(f"{profile!r} has no key: its results cannot be stored")
+        key = (SimulationCore.ENGINE_VERSION,) + SimulationCore.simulationKey(m, k, kp, hp, lp, g, end, **kwargs)
+        return hashlib.sha256(repr(key).encode()).hexdigest()
+
+    def path(self, key):
+        """Renvoie le chemin du fichier d'une clé
+
+        Args:
+            key (str): La clé
+
+        Returns:
+            str: Le chemin
+        """
+        return os.path.join(self.directory, key + ".npz")
+
+    def load(self, key):
+        """Charge un résultat s'il est sur le disque
+
+        Args:
+            key (str): La clé
+
+        Returns:
+            SimulationResult: Les données de la simulation, ou None si elles ne sont pas (ou plus) sur le disque
+        """
+        path = self.path(key)
+        try:
+            result = SimulationCore.loadResult(path)[0]
+            os.utime(path) #(Pour supprimer en premier les résultats utilisés le moins récemment)
+            return result
+        except Exception:
+            #Fichier absent ou illisible (supprimé par un autre programme pendant la lecture, ...)
+            return None
+
+    def save(self, key, result, params):
+        """Enregistre un résultat sur le disque. Le dossier n'est parcouru (voir evict()) que si sa taille dépasse maxBytes
+            ou tous les SCAN_EVERY enregistrements
+
+        Args:
+            key (str): La clé
+            result (SimulationResult): Les données de la simulation
+            params (dict): Les paramètres de la simulation
+        """
+        with FileTools.atomicWrite(self.path(key)) as f:
+            SimulationCore.saveResult(f, result, params)
+            fileSize = f.tell()
+
+        self.savesSinceScan += 1
+        if self.size is not None:
+            self.size += fileSize #(Trop grand si le fichier remplace un ancien résultat : corrigé au prochain parcours)
+        if self.size is None or self.size > self.maxBytes or self.savesSinceScan >= self.SCAN_EVERY:
+            self.evict()
+
+    def simulate(self, m, k, kp, hp, lp, g, end, **kwargs):
+        """Renvoie le résultat de la simulation, en le chargeant depuis le disque s'il y est déjà
+            (toujours calculé, et pas enregistré, si la forme de la pente n'a pas de clé donnée : voir SlopeProfiles.SlopeProfile)
+
+        Args:
+            m, k, kp, hp, lp, g, end (float): Les paramètres physiques (voir SimulationCore.simulate())
+            **kwargs : Les autres arguments de SimulationCore.simulate()
+
+        Returns:
+            SimulationResult: Les données de la simulation
+        """
+        profile = kwargs.get("profile")
+        if profile is not None and not profile.persistent:
+            self.misses += 1
+            return self.simulator(m, k, kp, hp, lp, g, end, **kwargs)
+
+        key = self.key(m, k, kp, hp, lp, g, end, **kwargs)
+        result = self.load(key)
+        if result is not None:
+            self.hits += 1
+            return result
+
+        self.misses += 1
+        result = self.simulator(m, k, kp, hp, lp, g, end, **kwargs)
+        params = {"m": m, "k": k, "kp": kp, "hp": hp, "lp": lp, "g": g, "Fin": end}
+        params.update(kwargs)
+        self.save(key, result, params)
+        return result
+
+    def evict(self):
+        """Supprime les résultats utilisés le moins récemment si le dossier est trop gros (jusqu'à EVICT_TO * maxBytes)
+            (et les fichiers temporaires abandonnés depuis plus d'une heure), puis met à jour la taille du dossier
+        """
+        files = []
+        for entry in os.scandir(self.directory):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            if entry.name.endswith(".tmp") and time.time() - stat.st_mtime > 3600:
+                self.remove(entry.path)
+            elif entry.name.endswith(".npz"):
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+
+        size = sum(file[1] for file in files)
+        limit = self.maxBytes if size <= self.maxBytes else self.EVICT_TO * self.maxBytes
+        for (_, fileSize, path) in sorted(files):
+            if size <= limit:
+                break
+            self.remove(path)
+            size -= fileSize
+        self.size = size
+        self.savesSinceScan = 0
+
+    def remove(self, path):
+        """Supprime un fichier du dossier (s'il n'a pas déjà été supprimé par un autre programme)
+
+        Args:
+            path (str): Le chemin du fichier
+        """
+        try:
+            os.remove(path)
+        except OSError:
+            pass
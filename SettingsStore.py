@@ -0,0 +1,90 @@
+#Equipe 1155
+#SettingsStore : Enregistrement des paramètres des interfaces graphiques (PhysicsSimulation, DataComparison, FunctionFinder) dans leur fichier JSON
+
+import json
+import time
+import FileTools
+
+
+class SettingsStore:
+    """A JSON settings file which is written a short time after the last change instead of at every change.
+        Several changes in a row (clicks, points placed, ...) are written only once, and the file is written
+        to a temporary file and then renamed (os.replace) so that it is never left half written."""
+
+    def __init__(self, filename, delay=500, maxDelay=5000):
+        """Creates the settings store
+
+        Args:
+            filename (str): The JSON file
+            delay (int, optional): The time without changes before the file is written [ms]. Defaults to 500.
+            maxDelay (int, optional): The maximal time a change can wait before being written, even if other changes keep coming [ms]. Defaults to 5000.
+        """
+        self.filename = filename
+        self.delay = delay
+        self.maxDelay = maxDelay
+        self.scheduler = None
+        self.timer = None
+        self.dictionary = None
+        self.firstChange = None
+
+    def setScheduler(self, window):
+        """Sets the Tkinter window used to write the file later (before this, the file is written at once)
+
+        Args:
+            window (tkinter.Tk): The window
+        """
+        self.scheduler = window
+
+    def load(self, dictionary):
+        """Tries to load the file. If it doesn't exist, create it with the default settings.
+
+        Args:
+            dictionary (dict): The default settings
+
+        Returns:
+            dict: The dictionary contained in the file if it existed. Else, the default settings.
+        """
+        try:
+            with open(self.filename, "r") as f:
+                dictionary = json.loads(f.read())
+        except FileNotFoundError:
+            self.save(dictionary)
+        return dictionary
+
+    def save(self, dictionary):
+        """Asks to save the settings (they are written when no other change was made for a short time)
+
+        Args:
+            dictionary (dict): The settings to save
+        """
+        self.dictionary = dictionary
+        if self.scheduler is None:
+            self.flush()
+            return
+
+        if self.timer is None:
+            self.firstChange = time.monotonic()
+        elif (time.monotonic() - self.firstChange) * 1000 < self.maxDelay:
+            self.scheduler.after_cancel(self.timer)
+        else:
+            return #(The file will be written soon, with these settings too)
+        self.timer = self.scheduler.after(self.delay, self.flush)
+
+    def flush(self):
+        """Writes the settings now if they changed since the last write
+        """
+        self.timer = None
+        if self.dictionary is None:
+            return
+        text = json.dumps(self.dictionary, indent=4)
+        self.dictionary = None
+
+        with FileTools.atomicWrite(self.filename, "w") as f:
+            f.write(text)
+
+    def close(self):
+        """Writes the settings which are waiting (when the window is closed)
+        """
+        if self.timer is not None:
+            self.scheduler.after_cancel(self.timer)
+        self.flush()
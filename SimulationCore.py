@@ -0,0 +1,1108 @@
+#Equipe 1155
+#SimulationCore : Simulation du véhicule sur la pente et sur le sol, sans interface graphique (utilisée par PhysicsSimulation et FrictionCoefficientsFinder)
+
+import functools
+import math
+import numpy as np
+from collections import OrderedDict
+import json
+import threading
+import time
+import FileTools
+import Profiling
+import SlopeProfiles
+
+ENGINE_VERSION = 1 #Version du calcul (à augmenter quand une modification change les résultats des simulations)
+
+#Format binaire des exports (.sim) : BINARY_MAGIC (8 octets), taille de l'en-tête (entier de 8 octets, little-endian),
+#en-tête JSON ("channels", "samples", "dtype", "params", ...) complété par des espaces pour que les données commencent à un multiple de 64 octets,
+#puis les données : un tableau float64 little-endian de forme (len(channels), samples), ligne par ligne
+BINARY_MAGIC = b"SIM1155\x01"
+BINARY_CHANNELS = ("t", "x", "y", "v", "a", "e_cin", "e_pot", "e_tot")
+
+
+def slopeProfile(x, h, w):
+    """Calcule la hauteur de la pente aux abscisses données
+
+    Args:
+        x (numpy.ndarray): Les abscisses (entre -w et 0) [m]
+        h (float): La hauteur de la pente [m]
+        w (float): La largeur de la pente [m]
+
+    Returns:
+        numpy.ndarray: La hauteur de la pente en chaque abscisse [m]
+    """
+    return SlopeProfiles.EXPONENTIAL.height(x, h, w) #La fonction la plus proche de notre pente (voir SlopeProfiles.py pour les autres formes)
+
+
+def slopeMesh(h, w, stepPente, curvatureWeight=0.5, profile=None):
+    """Découpe la pente en petits bouts de longueurs différentes : plus courts là où la pente est raide (découpes régulières le long de la courbe)
+        et là où elle est très courbée, pour que chaque bout apporte à peu près la même erreur
+
+    Args:
+        h (float): La hauteur de la pente [m]
+        w (float): La largeur de la pente [m]
+        stepPente (float): La largeur moyenne des découpes [m] (même nombre de découpes que np.arange(-w, 0, stepPente))
+        curvatureWeight (float, optional): L'importance de la courbure (0 : découpes de même longueur le long de la courbe). Defaults to 0.5.
+        profile (SlopeProfile, optional): La forme de la pente (voir SlopeProfiles.py). Defaults to None (pente exponentielle).
+
+    Returns:
+        numpy.ndarray: Les abscisses des extrémités des découpes, de -w à 0 [m]
+    """
+    profile = profile or SlopeProfiles.EXPONENTIAL
+    segments = max(int(np.ceil(w / stepPente)), 1)
+    xFine = np.linspace(-w, 0, max(4 * segments, 1024) + 1)
+    slope = profile.derivative(xFine, h, w)
+    norm = np.sqrt(1 + slope**2) #Longueur de la courbe par unité de x
+    curvature = np.abs(profile.secondDerivative(xFine, h, w)) / norm**3
+
+    #Densité des découpes le long de la courbe : 1 + curvatureWeight * sqrt(courbure * longueur), sans unité
+    #(l'écart entre un bout de pente droit et la courbe est proportionnel à courbure * longueur²)
+    length = np.sum((norm[1:] + norm[:-1]) / 2 * np.diff(xFine))
+    density = norm * (1 + curvatureWeight * np.sqrt(curvature * length))
+    cumulative = np.concatenate(([0], np.cumsum((density[1:] + density[:-1]) / 2 * np.diff(xFine))))
+    xMesh = np.interp(np.linspace(0, cumulative[-1], segments + 1), cumulative, xFine)
+    xMesh[0], xMesh[-1] = -w, 0
+    return xMesh
+
+
+class SimulationResult:
+    """Contient les données d'une simulation (pente puis sol)"""
+
+    def __init__(self, t, x, y, v, a, m, g):
+        """Rassemble les données de la simulation et calcule l'énergie
+
+        Args:
+            t (numpy.ndarray): Le temps [s] (t=0 : fin de la pente)
+            x (numpy.ndarray): La position x [m]
+            y (numpy.ndarray): La position y [m]
+            v (numpy.ndarray): La vitesse [m/s]
+            a (numpy.ndarray): L'accélération [m/s²]
+            m (float): La masse du véhicule [kg]
+            g (float): La constante de gravitation [m/s²]
+        """
+        self.t, self.x, self.y, self.v, self.a = t, x, y, v, a
+        with Profiling.profiler.section("énergie"):
+            self.e_pot = m * g * y
+            self.e_cin = m * v**2 / 2
+            self.e_tot = self.e_pot + self.e_cin
+        self.slopeInfo = None #Statistiques du calcul sur la pente (voir simulateSlopeAdaptive())
+        self.stopTime = None #Instant où le véhicule s'est arrêté sur le sol (voir simulate(), stopSpeed et stopEnergy) [s]
+        self.stopDistance = None #Distance parcourue sur le sol jusqu'à l'arrêt [m]
+
+
+def jsonValue(value):
+    """Convertit les valeurs que le module json ne sait pas écrire (nombres NumPy, formes de pente)
+
+    Args:
+        value: La valeur
+
+    Returns:
+        float or str: La valeur convertie (la clé de la forme de pente, voir SlopeProfiles.py)
+    """
+    if isinstance(value, SlopeProfiles.SlopeProfile):
+        return value.key
+    return float(value)
+
+
+def saveResult(file, result, params):
+    """Enregistre les données d'une simulation dans un fichier .npz compressé
+
+    Args:
+        file (str or file): Le fichier
+        result (SimulationResult): Les données de la simulation
+        params (dict): Les paramètres de la simulation (doivent contenir "m" et "g" pour recalculer l'énergie)
+    """
+    info = {"params": params, "slopeInfo": result.slopeInfo, "stopTime": result.stopTime, "stopDistance": result.stopDistance, "engineVersion": ENGINE_VERSION}
+    np.savez_compressed(file, t=result.t, x=result.x, y=result.y, v=result.v, a=result.a, info=json.dumps(info, default=jsonValue))
+
+
+def loadResult(file):
+    """Charge les données d'une simulation enregistrées avec saveResult()
+
+    Args:
+        file (str or file): Le fichier
+
+    Returns:
+        (SimulationResult, dict): Les données de la simulation, Les paramètres de la simulation
+    """
+    with np.load(file) as data:
+        info = json.loads(str(data["info"]))
+        params = info["params"]
+        result = SimulationResult(data["t"], data["x"], data["y"], data["v"], data["a"], params["m"], params["g"])
+    result.slopeInfo = info["slopeInfo"]
+    result.stopTime, result.stopDistance = info["stopTime"], info["stopDistance"]
+    return result, params
+
+
+def writeBinary(filename, data, channels, **header):
+    """Ecrit des données dans un fichier binaire .sim (voir BINARY_MAGIC).
+        Le fichier est écrit à part puis renommé (voir FileTools.atomicWrite()) : un programme qui lit déjà l'ancien fichier (openBinary(), memmap)
+        le garde intact, et on ne lit jamais un fichier à moitié écrit
+
+    Args:
+        filename (str): Le chemin du fichier
+        data (numpy.ndarray): Les données (une ligne par grandeur)
+        channels (tuple): Le nom de chaque grandeur
+        **header : Les autres informations à mettre dans l'en-tête
+    """
+    data = np.asarray(data, dtype="<f8")
+    header.update({"channels": channels, "samples": data.shape[1], "dtype": "<f8"})
+    header = json.dumps(header, default=jsonValue).encode()
+    header += b" " * (-(len(BINARY_MAGIC) + 8 + len(header)) % 64)
+
+    with FileTools.atomicWrite(filename) as f:
+        f.write(BINARY_MAGIC)
+        f.write(len(header).to_bytes(8, "little"))
+        f.write(header)
+        f.write(np.ascontiguousarray(data).tobytes())
+
+
+def exportBinary(filename, result, params):
+    """Exporte les données d'une simulation (toutes les grandeurs et les paramètres) dans un fichier binaire .sim (voir BINARY_MAGIC)
+
+    Args:
+        filename (str): Le chemin du fichier
+        result (SimulationResult): Les données de la simulation
+        params (dict): Les paramètres de la simulation
+    """
+    data = [getattr(result, channel) for channel in BINARY_CHANNELS]
+    writeBinary(filename, data, BINARY_CHANNELS, params=params, stopTime=result.stopTime, stopDistance=result.stopDistance, engineVersion=ENGINE_VERSION)
+
+
+def openBinary(filename):
+    """Ouvre un fichier binaire .sim sans le lire (projection en mémoire : les données ne sont lues que quand on les utilise)
+
+    Args:
+        filename (str): Le chemin du fichier
+
+    Returns:
+        (numpy.memmap, dict): Les données (une ligne par grandeur, dans l'ordre de header["channels"]), L'en-tête
+    """
+    with open(filename, "rb") as f:
+        if f.read(len(BINARY_MAGIC)) != BINARY_MAGIC:
+            raise ValueError(f"{filename} is not a simulation export (.sim)")
+        size = int.from_bytes(f.read(8), "little")
+        header = json.loads(f.read(size))
+    offset = len(BINARY_MAGIC) + 8 + size
+    data = np.memmap(filename, dtype=header["dtype"], mode="r", offset=offset, shape=(len(header["channels"]), header["samples"]))
+    return data, header
+
+
+class ExperimentalData:
+    """Données expérimentales (t, x, y, v, a) rangées par temps croissant dans un seul tableau structuré,
+        pour en garder seulement le début (t <= Fin) sans copier les données"""
+
+    def __init__(self, t, x, y, v, a):
+        """Range les données par temps croissant
+
+        Args:
+            t, x, y, v, a (numpy.ndarray): Les données expérimentales (dans n'importe quel ordre)
+        """
+        order = np.argsort(t, kind="stable")
+        self.data = np.empty(len(order), dtype=[(name, np.float64) for name in ("t", "x", "y", "v", "a")])
+        for (name, values) in zip(("t", "x", "y", "v", "a"), (t, x, y, v, a)):
+            self.data[name] = np.asarray(values, dtype=np.float64)[order]
+        self.t = self.data["t"]
+        self.end = None
+        self.windowed = self.data
+
+    def window(self, end):
+        """Renvoie les données jusqu'à un instant donné (le calcul n'est refait que si end a changé)
+
+        Args:
+            end (float): Le dernier instant gardé [s]
+
+        Returns:
+            numpy.ndarray: Les données avec t <= end (vue du tableau structuré, chaque grandeur est accessible par son nom : data["x"], ...)
+        """
+        if end != self.end:
+            self.windowed = self.data[:np.searchsorted(self.t, end, side="right")]
+            self.end = end
+        return self.windowed
+
+
+def loadExperimentalData(filename):
+    """Charge un fichier de données expérimentales (colonnes t, x, y, v et a)
+
+    Args:
+        filename (str): Le chemin du fichier
+
+    Returns:
+        ExperimentalData: Les données
+    """
+    return ExperimentalData(*np.loadtxt(filename, ndmin=2).T)
+
+
+@functools.lru_cache(maxsize=32)
+def slopeGeometry(profile, h, w, stepPente, mesh=False, curvatureWeight=0.5):
+    """Découpe la pente en petites pentes rectilignes et calcule leur taille et leur angle
+        (calculé une seule fois pour chaque pente et chaque découpe : changer la masse ou les frottements ne recalcule pas la géométrie)
+
+    Args:
+        profile (SlopeProfile): La forme de la pente (voir SlopeProfiles.py)
+        h (float): La hauteur de la pente [m]
+        w (float): La largeur de la pente [m]
+        stepPente (float): La taille des découpes de la pente [m] (largeur moyenne avec mesh)
+        mesh (bool, optional): Découpes adaptées à la forme de la pente (voir slopeMesh()) au lieu de np.arange(-w, 0, stepPente). Defaults to False.
+        curvatureWeight (float, optional): Voir slopeMesh(). Defaults to 0.5.
+
+    Returns:
+        tuple: Les abscisses et les hauteurs des extrémités des petites pentes (numpy.ndarray en lecture seule),
+            et les listes de la taille, du sinus et du cosinus de l'angle de chaque petite pente (angle 0 ajouté à la fin : sol)
+    """
+    xPente = slopeMesh(h, w, stepPente, curvatureWeight, profile) if mesh else np.arange(-w, 0, stepPente)
+    yPente = profile.height(xPente, h, w)
+    lengths = np.sqrt(np.diff(xPente)**2 + np.diff(yPente)**2).tolist()
+    angles = np.arctan(-np.diff(yPente) / np.diff(xPente)).tolist() + [0]
+    xPente.setflags(write=False)
+    yPente.setflags(write=False)
+    return xPente, yPente, lengths, [math.sin(angle) for angle in angles], [math.cos(angle) for angle in angles]
+
+
+def simulateSegments(kp, m, g, geometry):
+    """Simule le mouvement du véhicule sur une pente découpée en petites pentes rectilignes
+
+    Args:
+        kp (float): Le coefficient de frottement sur la pente [kg/s]
+        m (float): La masse du véhicule [kg]
+        g (float): La constante de gravitation [m/s²]
+        geometry (tuple): La découpe de la pente (voir slopeGeometry())
+
+    Returns:
+        tuple (numpy.ndarray x6): x, y, vx, vy, a et t sur la pente (t=0 : haut de la pente)
+    """
+    xPente, yPente, lengths, sines, cosines = geometry
+    vxPente = np.zeros_like(xPente)
+    vyPente = np.zeros_like(xPente)
+    aPente = np.zeros_like(xPente)
+    tPente = np.zeros_like(xPente)
+    a, dt, vx, vy = [g], [0], [0], [0]
+
+    vf = 0
+    for i in range(1, len(xPente)):
+        #Analyse du petit bout de pente (supposé droit) entre le dernier point et le point actuel
+        vi = vf #Vitesse précédente
+        ai = g * sines[i-1] - (kp * vi) / m #Norme de l'accélération sur le petit bout de pente (y compris frottements)
+
+        #Résolution d'un MRUA sur le petit bout de pente
+        vf2 = 2*ai*lengths[i-1] + vi**2
+        vf = math.sqrt(vf2) if vf2 >= 0 else math.nan #(NaN : le véhicule s'arrête sur la pente)
+        a.append(ai)
+        dt.append((-vi + vf) / ai if ai != 0 else math.nan)
+
+        #Vitesse exprimée dans la direction du prochain bout de pente
+        vx.append(vf * cosines[i])
+        vy.append(- vf * sines[i])
+
+    aPente[:] = a
+    tPente[:] = np.cumsum(dt)
+    vxPente[:] = vx
+    vyPente[:] = vy
+    return xPente, yPente, vxPente, vyPente, aPente, tPente
+
+
+def simulateSlope(kp, m, h, w, g, stepPente, profile=None):
+    """Simule le mouvement du véhicule sur la pente en la découpant en une multitude de petites pentes rectilignes
+
+    Args:
+        kp (float): Le coefficient de frottement sur la pente [kg/s]
+        m (float): La masse du véhicule [kg]
+        h (float): La hauteur de la pente [m]
+        w (float): La largeur de la pente [m]
+        g (float): La constante de gravitation [m/s²]
+        stepPente (float): La taille des découpes de la pente [m]
+        profile (SlopeProfile, optional): La forme de la pente (voir SlopeProfiles.py). Defaults to None (pente exponentielle).
+
+    Returns:
+        tuple (numpy.ndarray x6): x, y, vx, vy, a et t sur la pente (t=0 : haut de la pente ; x et y en lecture seule)
+    """
+    return simulateSegments(kp, m, g, slopeGeometry(profile or SlopeProfiles.EXPONENTIAL, h, w, stepPente))
+
+
+def simulateSlopeMesh(kp, m, h, w, g, stepPente, curvatureWeight=0.5, profile=None):
+    """Simule le mouvement du véhicule sur la pente découpée en petites pentes rectilignes de longueurs adaptées à la forme de la pente (voir slopeMesh())
+
+    Args:
+        kp, m, h, w, g (float): Voir simulateSlope()
+        stepPente (float): La largeur moyenne des découpes de la pente [m]
+        curvatureWeight (float, optional): Voir slopeMesh(). Defaults to 0.5.
+        profile (SlopeProfile, optional): La forme de la pente (voir SlopeProfiles.py). Defaults to None (pente exponentielle).
+
+    Returns:
+        tuple (numpy.ndarray x6): x, y, vx, vy, a et t sur la pente, bas de la pente compris (t=0 : haut de la pente ; x et y en lecture seule)
+    """
+    return simulateSegments(kp, m, g, slopeGeometry(profile or SlopeProfiles.EXPONENTIAL, h, w, stepPente, True, curvatureWeight))
+
+
+def simulateSlopeAdaptive(kp, m, h, w, g, xSamples=None, tSamples=None, rtol=1e-8, atol=1e-10, tMax=100, profile=None):
+    """Simule le mouvement du véhicule sur la pente en intégrant l'équation du mouvement le long de la courbe
+        avec un pas adaptatif (solve_ivp de SciPy, contrôle de l'erreur par rtol et atol)
+
+    Args:
+        kp (float): Le coefficient de frottement sur la pente [kg/s]
+        m (float): La masse du véhicule [kg]
+        h (float): La hauteur de la pente [m]
+        w (float): La largeur de la pente [m]
+        g (float): La constante de gravitation [m/s²]
+        xSamples (numpy.ndarray, optional): Les abscisses où échantillonner le mouvement [m]. Defaults to np.arange(-w, 0, 0.001).
+        tSamples (numpy.ndarray, optional): Les instants où échantillonner le mouvement (t=0 : haut de la pente) [s]. Remplace xSamples si donné.
+        rtol (float, optional): La tolérance relative du solveur. Defaults to 1e-8.
+        atol (float, optional): La tolérance absolue du solveur. Defaults to 1e-10.
+        tMax (float, optional): La durée maximale sur la pente [s]. Defaults to 100.
+        profile (SlopeProfile, optional): La forme de la pente (voir SlopeProfiles.py). Defaults to None (pente exponentielle).
+
+    Returns:
+        tuple (numpy.ndarray x6, dict): x, y, vx, vy, a et t aux échantillons (t=0 : haut de la pente),
+            et les statistiques ("nSteps" : nombre de pas, "nfev" : nombre d'évaluations, "exitSpeed" : vitesse en bas de pente, "exitTime" : durée de la descente).
+            Si le véhicule n'arrive pas en bas de la pente avant tMax, exitSpeed et exitTime sont NaN (comme avec simulateSlope()),
+            ainsi que les échantillons des abscisses qu'il n'atteint pas
+    """
+    profile = profile or SlopeProfiles.EXPONENTIAL
+
+    def acceleration(x, v):
+        #Accélération le long de la courbe : g*sin(angle) - kp*v/m, avec sin(angle) = -y'/sqrt(1+y'²)
+        slope = profile.derivative(x, h, w)
+        norm = np.sqrt(1 + slope**2)
+        return -g * slope / norm - kp * v / m, norm
+
+    def equations(t, state):
+        a, norm = acceleration(state[0], state[1])
+        return (state[1] / norm, a)
+
+    def bottom(t, state):
+        return state[0]
+    bottom.terminal = True
+    bottom.direction = 1
+
+    from scipy.integrate import solve_ivp #(Importé seulement ici : SciPy est long à charger et les autres moteurs n'en ont pas besoin)
+    sol = solve_ivp(equations, (0, tMax), (-w, 0), rtol=rtol, atol=atol, events=bottom, dense_output=True)
+    exited = sol.t_events[0].size > 0
+    if exited:
+        exitTime, exitSpeed = sol.t_events[0][0], sol.y_events[0][0][1]
+    else:
+        exitTime, exitSpeed = math.nan, math.nan #(Le véhicule s'arrête sur la pente : pas de sortie)
+    tLast = exitTime if exited else sol.t[-1]
+
+    if tSamples is not None:
+        tPente = np.clip(np.asarray(tSamples, dtype=float), 0, tLast)
+    else:
+        if xSamples is None:
+            xSamples = np.arange(-w, 0, 0.001)
+        #x(t) est croissant : inversion par interpolation sur la sortie dense, puis une itération de Newton
+        tFine = np.linspace(0, tLast, 8 * len(sol.t))
+        tPente = np.interp(xSamples, sol.sol(tFine)[0], tFine)
+        xPente, vPente = sol.sol(tPente)
+        speed = vPente / np.sqrt(1 + profile.derivative(xPente, h, w)**2)
+        moving = speed > 0
+        tPente[moving] -= (xPente[moving] - np.asarray(xSamples)[moving]) / speed[moving]
+        tPente = np.clip(tPente, 0, tLast)
+
+    xPente, vPente = sol.sol(tPente)
+    aPente, norm = acceleration(xPente, vPente)
+    yPente = profile.height(xPente, h, w)
+    vxPente = vPente / norm
+    vyPente = vPente * profile.derivative(xPente, h, w) / norm
+    if not exited and tSamples is None:
+        unreached = np.asarray(xSamples) > sol.y[0][-1]
+        for array in (xPente, yPente, vxPente, vyPente, aPente, tPente):
+            array[unreached] = np.nan
+
+    stats = {"nSteps": len(sol.t) - 1, "nfev": sol.nfev, "exitSpeed": exitSpeed, "exitTime": exitTime}
+    return xPente, yPente, vxPente, vyPente, aPente, tPente, stats
+
+
+def groundExact(v0, k, m, t):
+    """Calcule la solution exacte du mouvement sur le sol (frottement F = -kv) aux instants donnés
+
+    Args:
+        v0 (float or numpy.ndarray): La vitesse en fin de pente [m/s]
+        k (float or numpy.ndarray): Le coefficient de frottement sur le sol [kg/s]
+        m (float or numpy.ndarray): La masse du véhicule [kg]
+        t (numpy.ndarray): Les instants (t=0 : fin de la pente) [s]
+        (v0, k et m peuvent être des tableaux de forme (N, 1) pour calculer N mouvements à la fois)
+
+    Returns:
+        tuple (numpy.ndarray x3): x, v et a aux instants donnés
+    """
+    t = np.asarray(t, dtype=float)
+    rate = np.asarray(k, dtype=float) / m
+
+    #v(t) = v0 * e^(-kt/m) ; x(t) = v0 * m/k * (1 - e^(-kt/m)) (x(t) = v0 * t si k = 0) ; a(t) = -k/m * v(t)
+    decay = -rate * t
+    v = v0 * np.exp(decay)
+    x = np.where(rate == 0, v0 * t, -v0 / np.where(rate == 0, 1, rate) * np.expm1(decay))
+    a = -rate * v
+    return x, v, a
+
+
+def groundStopTime(v0, k, m, speed):
+    """Calcule (avec la solution exacte) l'instant où la vitesse sur le sol descend jusqu'à une certaine vitesse
+
+    Args:
+        v0 (float or numpy.ndarray): La vitesse en fin de pente [m/s]
+        k (float or numpy.ndarray): Le coefficient de frottement sur le sol [kg/s]
+        m (float or numpy.ndarray): La masse du véhicule [kg]
+        speed (float or numpy.ndarray): La vitesse d'arrêt [m/s]
+
+    Returns:
+        float or numpy.ndarray: L'instant (t=0 : fin de la pente) [s] (np.inf si le véhicule ne s'arrête jamais)
+    """
+    v0, k, speed = np.asarray(v0, dtype=float), np.asarray(k, dtype=float), np.asarray(speed, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        duration = m / k * np.log(v0 / speed) #v(t) = v0 * e^(-kt/m) = speed
+    return np.where(v0 <= speed, 0.0, np.where(k > 0, duration, np.inf))[()]
+
+
+def stopThreshold(m, stopSpeed=None, stopEnergy=None):
+    """Calcule la vitesse en dessous de laquelle le véhicule est considéré comme arrêté
+
+    Args:
+        m (float or numpy.ndarray): La masse du véhicule [kg]
+        stopSpeed (float, optional): La vitesse d'arrêt [m/s]. Defaults to None.
+        stopEnergy (float, optional): L'énergie cinétique d'arrêt [J] (sur le sol, l'énergie potentielle est nulle). Defaults to None.
+
+    Returns:
+        float or numpy.ndarray: La vitesse d'arrêt (la plus grande des deux) [m/s], ou None si aucun critère n'est donné
+    """
+    if stopSpeed is None and stopEnergy is None:
+        return None
+    speed = 0 if stopSpeed is None else stopSpeed
+    if stopEnergy is not None:
+        speed = np.maximum(speed, np.sqrt(2 * stopEnergy / m))
+    return speed
+
+
+def groundStop(t, x, v, speed):
+    """Cherche le premier instant où la vitesse sur le sol est inférieure ou égale à la vitesse d'arrêt
+
+    Args:
+        t (numpy.ndarray): Le temps sur le sol [s]
+        x (numpy.ndarray): La position sur le sol [m]
+        v (numpy.ndarray): La vitesse sur le sol [m/s]
+        speed (float): La vitesse d'arrêt [m/s]
+
+    Returns:
+        tuple (float, float): L'instant de l'arrêt et la distance parcourue sur le sol, ou (None, None) si le véhicule ne s'arrête pas
+    """
+    stopped = v <= speed
+    if not np.any(stopped):
+        return (None, None)
+    i = np.argmax(stopped)
+    return (float(t[i]), float(x[i]))
+
+
+def simulateGround(v0, k, m, end, step, engine="euler", stopSpeed=None, stopPadding=0):
+    """Simule le mouvement du véhicule sur le sol (frottement F = -kv)
+
+    Args:
+        v0 (float): La vitesse en fin de pente [m/s]
+        k (float): Le coefficient de frottement sur le sol [kg/s]
+        m (float): La masse du véhicule [kg]
+        end (float): La durée simulée sur le sol [s]
+        step (float): Le pas de temps [s]
+        engine (str, optional): "euler" (méthode d'Euler pas à pas) ou "exact" (solution exacte vectorisée). Defaults to "euler".
+        stopSpeed (float, optional): Si donnée, la simulation s'arrête (stopPadding après) quand la vitesse descend jusqu'à stopSpeed [m/s]. Defaults to None.
+        stopPadding (float, optional): La durée simulée en plus après l'arrêt [s]. Defaults to 0.
+
+    Returns:
+        tuple (numpy.ndarray x4): t, x, v et a sur le sol (t=0 : fin de la pente)
+    """
+    if stopSpeed is not None:
+        #(La méthode d'Euler ralentit un peu plus vite que la solution exacte : elle est aussi arrêtée à cet instant)
+        end = min(end, groundStopTime(v0, k, m, stopSpeed) + stopPadding + step)
+    t = np.arange(0, end, step)
+    if engine == "exact":
+        x, v, a = groundExact(v0, k, m, t)
+        return t, x, v, a
+    elif engine != "euler":
+        raise ValueError(f"Unknown ground engine: {engine}")
+
+    x = np.zeros_like(t)
+    v = np.zeros_like(t)
+    a = np.zeros_like(t)
+    if len(t) == 0:
+        return t, x, v, a
+
+    #Calcul de la position, vitesse et accélération à chaque instant (avec un dt très petit)
+    x[0] = 0
+    v[0] = v0
+    for i in range(len(t)-1):
+        dt = step
+
+        #Calcul du frottement et de l'accélération
+        f_frott = -k*v[i] #F = -kv
+        a[i] = f_frott/m #F = ma
+
+        v[i+1] = v[i] + (a[i] * dt) #Ajout de l'accélération * dt à la vitesse
+        x[i+1] = x[i] + (v[i] * dt) #Ajout de la vitesse * dt à la position
+
+    return t, x, v, a
+
+
+def compareGroundEngines(v0, k, m, end, step):
+    """Compare la méthode d'Euler et la solution exacte sur le sol (écart et temps de calcul)
+
+    Args:
+        v0 (float): La vitesse en fin de pente [m/s]
+        k (float): Le coefficient de frottement sur le sol [kg/s]
+        m (float): La masse du véhicule [kg]
+        end (float): La durée simulée sur le sol [s]
+        step (float): Le pas de temps [s]
+
+    Returns:
+        dict: Les écarts maximaux sur x, v et a ("dx", "dv", "da"), les temps de calcul ("eulerTime", "exactTime") et le gain ("speedup")
+    """
+    start = time.perf_counter()
+    _, xEuler, vEuler, aEuler = simulateGround(v0, k, m, end, step, "euler")
+    eulerTime = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _, xExact, vExact, aExact = simulateGround(v0, k, m, end, step, "exact")
+    exactTime = time.perf_counter() - start
+
+    #(La méthode d'Euler ne calcule pas l'accélération au dernier instant)
+    return {
+        "dx": float(np.max(np.abs(xEuler - xExact), initial=0)),
+        "dv": float(np.max(np.abs(vEuler - vExact), initial=0)),
+        "da": float(np.max(np.abs(aEuler[:-1] - aExact[:-1]), initial=0)),
+        "eulerTime": eulerTime,
+        "exactTime": exactTime,
+        "speedup": eulerTime / exactTime if exactTime > 0 else float("inf")
+    }
+
+
+def simulateSlopePhase(kp, m, hp, lp, g, stepPente, slopeEngine, profile=None):
+    """Simule la pente avec la méthode de calcul choisie (voir simulate())
+
+    Args:
+        kp, m, hp, lp, g (float): Les paramètres physiques (voir simulate())
+        stepPente (float): La taille des découpes de la pente [m]
+        slopeEngine (str): La méthode de calcul sur la pente ("segments", "mesh" ou "adaptive")
+        profile (SlopeProfile, optional): La forme de la pente (voir SlopeProfiles.py). Defaults to None (pente exponentielle).
+
+    Returns:
+        tuple: x, y, vx, vy, a et t sur la pente, la vitesse et l'instant en fin de pente, les statistiques du calcul (None pour "segments" et "mesh")
+    """
+    if slopeEngine == "adaptive":
+        *arrays, info = simulateSlopeAdaptive(kp, m, hp, lp, g, np.arange(-lp, 0, stepPente), profile=profile)
+        return (*arrays, info["exitSpeed"], info["exitTime"], info)
+    elif slopeEngine == "segments":
+        arrays = simulateSlope(kp, m, hp, lp, g, stepPente, profile)
+        return (*arrays, arrays[2][-1], arrays[5][-1], None)
+    elif slopeEngine == "mesh":
+        arrays = simulateSlopeMesh(kp, m, hp, lp, g, stepPente, profile=profile)
+        #(Le dernier point, en bas de la pente, est le premier point du sol)
+        return (*(array[:-1] for array in arrays), arrays[2][-1], arrays[5][-1], None)
+    raise ValueError(f"Unknown slope engine: {slopeEngine}")
+
+
+def simulate(m, k, kp, hp, lp, g, end, step=0.001, stepPente=0.001, groundEngine="euler", slopeEngine="segments", stopSpeed=None, stopEnergy=None, stopPadding=0, profile=None):
+    """Simule la position (x et y), la vitesse, l'accélération et l'énergie sur la pente et sur le sol
+
+    Args:
+        m (float): La masse du véhicule [kg]
+        k (float): Le coefficient de frottement sur le sol [kg/s]
+        kp (float): Le coefficient de frottement sur la pente [kg/s]
+        hp (float): La hauteur de la pente [m]
+        lp (float): La largeur de la pente [m]
+        g (float): La constante de gravitation [m/s²]
+        end (float): La durée simulée sur le sol [s]
+        step (float, optional): Le pas de temps sur le sol [s]. Defaults to 0.001.
+        stepPente (float, optional): La taille des découpes de la pente [m]. Defaults to 0.001.
+        groundEngine (str, optional): La méthode de calcul sur le sol ("euler" ou "exact", voir simulateGround()). Defaults to "euler".
+        slopeEngine (str, optional): La méthode de calcul sur la pente ("segments" : petites pentes rectilignes, voir simulateSlope() ;
+            "mesh" : petites pentes rectilignes plus courtes là où la pente est raide ou courbée, de largeur moyenne stepPente, voir simulateSlopeMesh() ;
+            "adaptive" : intégration à pas adaptatif, voir simulateSlopeAdaptive(), échantillonnée tous les stepPente). Defaults to "segments".
+        stopSpeed (float, optional): La vitesse en dessous de laquelle le véhicule est considéré comme arrêté sur le sol [m/s]. Defaults to None.
+        stopEnergy (float, optional): L'énergie en dessous de laquelle le véhicule est considéré comme arrêté sur le sol [J]. Defaults to None.
+        stopPadding (float, optional): La durée simulée en plus après l'arrêt [s]. Defaults to 0.
+        profile (SlopeProfile, optional): La forme de la pente, mise à l'échelle de hp et lp (voir SlopeProfiles.py). Defaults to None (pente exponentielle).
+        (Si stopSpeed ou stopEnergy est donné, la simulation s'arrête avant "end" quand le véhicule est arrêté,
+        et result.stopTime et result.stopDistance donnent l'instant de l'arrêt et la distance parcourue sur le sol)
+
+    Returns:
+        SimulationResult: Les données de la simulation
+    """
+    with Profiling.profiler.section("pente"):
+        xPente, yPente, vxPente, vyPente, aPente, tPente, exitSpeed, exitTime, slopeInfo = simulateSlopePhase(kp, m, hp, lp, g, stepPente, slopeEngine, profile)
+    threshold = stopThreshold(m, stopSpeed, stopEnergy)
+    with Profiling.profiler.section("sol"):
+        t, x, v, a = simulateGround(exitSpeed, k, m, end, step, groundEngine, threshold, stopPadding)
+    stopTime, stopDistance = groundStop(t, x, v, threshold) if threshold is not None else (None, None)
+
+    #Rassembler les données de la pente et du sol
+    t = np.concatenate((-exitTime+tPente, t))
+    x = np.concatenate((xPente, x))
+    y = np.concatenate((yPente, np.zeros_like(v)))
+    v = np.concatenate((np.sqrt(vxPente**2+vyPente**2), v))
+    a = np.concatenate((aPente, a))
+
+    result = SimulationResult(t, x, y, v, a, m, g)
+    result.slopeInfo = slopeInfo
+    result.stopTime, result.stopDistance = stopTime, stopDistance
+    return result
+
+
+def simulateStream(m, k, kp, hp, lp, g, end, step=0.001, stepPente=0.001, groundEngine="euler", slopeEngine="segments", stopSpeed=None, stopEnergy=None, stopPadding=0, profile=None, chunkSize=65536):
+    """Simule comme simulate(), mais renvoie les données morceau par morceau au lieu de garder tout le mouvement en mémoire
+        (seule la pente, dont la taille ne dépend pas de "end", est calculée en une fois)
+
+    Args:
+        Les mêmes que simulate()
+        chunkSize (int, optional): Le nombre d'instants de chaque morceau (le dernier peut être plus court). Defaults to 65536.
+
+    Yields:
+        SimulationResult: Les données de chaque morceau, dans l'ordre (mises bout à bout, elles sont égales au résultat de simulate()).
+            stopTime et stopDistance sont donnés à partir du morceau où le véhicule s'arrête
+    """
+    if groundEngine not in ("euler", "exact"):
+        raise ValueError(f"Unknown ground engine: {groundEngine}")
+    xPente, yPente, vxPente, vyPente, aPente, tPente, exitSpeed, exitTime, slopeInfo = simulateSlopePhase(kp, m, hp, lp, g, stepPente, slopeEngine, profile)
+    threshold = stopThreshold(m, stopSpeed, stopEnergy)
+    if threshold is not None:
+        end = min(end, groundStopTime(exitSpeed, k, m, threshold) + stopPadding + step)
+    slopeSize = len(tPente)
+    groundSize = max(int(np.ceil(end / step)), 0) #(Taille de np.arange(0, end, step), sans le créer)
+    xSol, vSol = 0.0, exitSpeed #Etat de la méthode d'Euler au début du morceau suivant
+    stopTime, stopDistance = None, None
+
+    for start in range(0, slopeSize + groundSize, chunkSize):
+        stop = min(start + chunkSize, slopeSize + groundSize)
+
+        #Pente
+        slope = slice(min(start, slopeSize), min(stop, slopeSize))
+        tParts = [-exitTime+tPente[slope]]
+        xParts = [xPente[slope]]
+        yParts = [yPente[slope]]
+        vParts = [np.sqrt(vxPente[slope]**2+vyPente[slope]**2)]
+        aParts = [aPente[slope]]
+
+        #Sol
+        first, last = max(start - slopeSize, 0), max(stop - slopeSize, 0)
+        if last > first:
+            t = np.arange(first, last) * step
+            if groundEngine == "exact":
+                x, v, a = groundExact(exitSpeed, k, m, t)
+            else:
+                x = np.zeros_like(t)
+                v = np.zeros_like(t)
+                a = np.zeros_like(t)
+                x[0] = xSol
+                v[0] = vSol
+                for i in range(len(t)-1):
+                    a[i] = (-k*v[i])/m #F = -kv = ma
+                    v[i+1] = v[i] + (a[i] * step)
+                    x[i+1] = x[i] + (v[i] * step)
+                if last < groundSize:
+                    #(Au dernier instant de la simulation, l'accélération n'est pas calculée, comme dans simulateGround())
+                    a[-1] = (-k*v[-1])/m
+                    xSol, vSol = x[-1] + (v[-1] * step), v[-1] + (a[-1] * step)
+            if threshold is not None and stopTime is None:
+                stopTime, stopDistance = groundStop(t, x, v, threshold)
+            tParts.append(t)
+            xParts.append(x)
+            yParts.append(np.zeros_like(v))
+            vParts.append(v)
+            aParts.append(a)
+
+        chunk = SimulationResult(np.concatenate(tParts), np.concatenate(xParts), np.concatenate(yParts), np.concatenate(vParts), np.concatenate(aParts), m, g)
+        chunk.slopeInfo = slopeInfo
+        chunk.stopTime, chunk.stopDistance = stopTime, stopDistance
+        yield chunk
+
+
+def exportStream(filename, chunks):
+    """Exporte les données d'une simulation morceau par morceau dans un fichier texte (colonnes t, x, y, v et a, comme l'export de PhysicsSimulation)
+
+    Args:
+        filename (str): Le chemin du fichier
+        chunks (iterable): Les morceaux de la simulation (voir simulateStream())
+
+    Returns:
+        int: Le nombre d'instants exportés
+    """
+    samples = 0
+    with open(filename, "w") as f:
+        for chunk in chunks:
+            np.savetxt(f, np.array((chunk.t, chunk.x, chunk.y, chunk.v, chunk.a)).T)
+            samples += len(chunk.t)
+    return samples
+
+
+def summarizeStream(chunks):
+    """Calcule les grandeurs principales d'une simulation morceau par morceau (sans garder les données)
+
+    Args:
+        chunks (iterable): Les morceaux de la simulation (voir simulateStream())
+
+    Returns:
+        dict: La vitesse maximale et son instant ("maxSpeed", "maxSpeedTime"), la position finale ("finalX"), l'énergie finale ("finalEnergy"),
+            l'instant de l'arrêt et la distance parcourue sur le sol ("stopTime", "stopDistance", None sans critère d'arrêt) et le nombre d'instants ("samples")
+    """
+    summary = {"maxSpeed": -np.inf, "maxSpeedTime": None, "finalX": None, "finalEnergy": None, "stopTime": None, "stopDistance": None, "samples": 0}
+    for chunk in chunks:
+        if len(chunk.t) == 0:
+            continue
+        i = np.argmax(chunk.v)
+        if chunk.v[i] > summary["maxSpeed"]:
+            summary["maxSpeed"], summary["maxSpeedTime"] = float(chunk.v[i]), float(chunk.t[i])
+        summary["finalX"], summary["finalEnergy"] = float(chunk.x[-1]), float(chunk.e_tot[-1])
+        summary["stopTime"], summary["stopDistance"] = chunk.stopTime, chunk.stopDistance
+        summary["samples"] += len(chunk.t)
+    return summary
+
+
+class IncrementalSimulation:
+    """Simulateur qui garde les données de la pente et du sol de la dernière simulation
+        et ne recalcule que la partie dont les paramètres ont changé"""
+
+    def __init__(self):
+        """Initialise le simulateur (aucune donnée en mémoire)
+        """
+        self.slopeInputs = None #Paramètres dont dépend la pente : kp, m, hp, lp, g, stepPente, slopeEngine, profile
+        self.slope = None #x, y, vx, vy, a, t sur la pente, vitesse et durée en fin de pente, statistiques
+        self.groundInputs = None #Paramètres dont dépend le sol : vitesse en fin de pente, k, m, step, groundEngine
+        self.ground = None #t, x, v, a sur le sol (jusqu'au plus grand "end" déjà demandé)
+        self.recomputed = {"slope": False, "ground": None} #Ce qui a été recalculé lors du dernier appel
+
+    def simulate(self, m, k, kp, hp, lp, g, end, step=0.001, stepPente=0.001, groundEngine="euler", slopeEngine="segments", stopSpeed=None, stopEnergy=None, stopPadding=0, profile=None):
+        """Simule comme simulate(), en réutilisant la pente et/ou le sol de la simulation précédente s'ils n'ont pas changé
+            (un "end" plus grand prolonge les données du sol au lieu de tout recalculer)
+
+        Args:
+            Les mêmes que simulate()
+
+        Returns:
+            SimulationResult: Les données de la simulation
+        """
+        ## Pente : ne dépend que de kp, m, hp, lp, g et de la forme de la pente
+        slopeInputs = (kp, m, hp, lp, g, stepPente, slopeEngine, profile or SlopeProfiles.EXPONENTIAL)
+        self.recomputed = {"slope": slopeInputs != self.slopeInputs, "ground": None}
+        if self.recomputed["slope"]:
+            with Profiling.profiler.section("pente"):
+                self.slope = simulateSlopePhase(kp, m, hp, lp, g, stepPente, slopeEngine, profile)
+            self.slopeInputs = slopeInputs
+        xPente, yPente, vxPente, vyPente, aPente, tPente, exitSpeed, exitTime, slopeInfo = self.slope
+
+        ## Sol : ne dépend que de la vitesse en fin de pente, de k et de m
+        groundInputs = (exitSpeed, k, m, step, groundEngine)
+        threshold = stopThreshold(m, stopSpeed, stopEnergy)
+        if threshold is not None:
+            end = min(end, groundStopTime(exitSpeed, k, m, threshold) + stopPadding + step)
+        size = len(np.arange(0, end, step))
+        with Profiling.profiler.section("sol"):
+            if groundInputs != self.groundInputs:
+                self.ground = simulateGround(exitSpeed, k, m, end, step, groundEngine)
+                self.groundInputs = groundInputs
+                self.recomputed["ground"] = "full"
+            elif size > len(self.ground[0]) and len(self.ground[0]) == 0:
+                self.ground = simulateGround(exitSpeed, k, m, end, step, groundEngine)
+                self.recomputed["ground"] = "full"
+            elif size > len(self.ground[0]):
+                self.extendGround(end)
+                self.recomputed["ground"] = "extend"
+        t, x, v, a = [array[:size] for array in self.ground]
+        stopTime, stopDistance = groundStop(t, x, v, threshold) if threshold is not None else (None, None)
+
+        #Rassembler les données de la pente et du sol
+        t = np.concatenate((-exitTime+tPente, t))
+        x = np.concatenate((xPente, x))
+        y = np.concatenate((yPente, np.zeros_like(v)))
+        v = np.concatenate((np.sqrt(vxPente**2+vyPente**2), v))
+        a = np.concatenate((aPente, a))
+        if groundEngine == "euler" and size > 0:
+            a[-1] = 0 #(Comme simulateGround(), la méthode d'Euler ne calcule pas l'accélération au dernier instant)
+
+        result = SimulationResult(t, x, y, v, a, m, g)
+        result.slopeInfo = slopeInfo
+        result.stopTime, result.stopDistance = stopTime, stopDistance
+        return result
+
+    def extendGround(self, end):
+        """Prolonge les données du sol jusqu'à "end" (sans recalculer les instants déjà simulés)
+
+        Args:
+            end (float): La nouvelle durée simulée sur le sol [s]
+        """
+        exitSpeed, k, m, step, groundEngine = self.groundInputs
+        t = np.arange(0, end, step)
+        t0, x0, v0, a0 = self.ground
+        start = len(t0)
+
+        if groundEngine == "exact":
+            x, v, a = groundExact(exitSpeed, k, m, t[start:])
+        else:
+            #On reprend la méthode d'Euler là où elle s'était arrêtée (l'accélération au dernier instant n'avait pas été calculée)
+            x = np.zeros(len(t) - start)
+            v = np.zeros_like(x)
+            a = np.zeros_like(x)
+            a0 = a0.copy()
+            a0[-1] = (-k*v0[-1])/m
+            v[0] = v0[-1] + (a0[-1] * step)
+            x[0] = x0[-1] + (v0[-1] * step)
+            for i in range(len(x)-1):
+                a[i] = (-k*v[i])/m
+                v[i+1] = v[i] + (a[i] * step)
+                x[i+1] = x[i] + (v[i] * step)
+
+        self.ground = (t, np.concatenate((x0, x)), np.concatenate((v0, v)), np.concatenate((a0, a)))
+
+
+def simulationKey(m, k, kp, hp, lp, g, end, **kwargs):
+    """Crée la clé identifiant une simulation (tous les arguments de simulate(), y compris les pas et les méthodes de calcul)
+
+    Args:
+        m, k, kp, hp, lp, g, end (float): Les paramètres physiques (voir simulate())
+        **kwargs : Les autres arguments de simulate() (step, stepPente, groundEngine, slopeEngine, ...)
+
+    Returns:
+        tuple: La clé (utilisable dans un dictionnaire)
+    """
+    options = {"step": 0.001, "stepPente": 0.001, "groundEngine": "euler", "slopeEngine": "segments", "stopSpeed": None, "stopEnergy": None, "stopPadding": 0}
+    options.update(kwargs)
+    if options.get("profile", None) in (None, SlopeProfiles.EXPONENTIAL):
+        options.pop("profile", None) #(Pente par défaut : même clé qu'avant l'ajout des autres formes de pente)
+    return (float(m), float(k), float(kp), float(hp), float(lp), float(g), float(end)) + tuple(sorted(options.items()))
+
+
+class SimulationCache:
+    """Garde en mémoire les derniers résultats de simulation (LRU : le résultat utilisé le moins récemment est oublié en premier)"""
+
+    def __init__(self, maxSize=32, simulator=simulate):
+        """Initialise le cache
+
+        Args:
+            maxSize (int, optional): Le nombre maximal de résultats gardés. Defaults to 32.
+            simulator (function, optional): La fonction appelée quand le résultat n'est pas en mémoire
+                (mêmes arguments que simulate(), par exemple IncrementalSimulation().simulate). Defaults to simulate.
+        """
+        self.maxSize = maxSize
+        self.simulator = simulator
+        self.hits = 0
+        self.misses = 0
+        self.results = OrderedDict()
+
+    def simulate(self, m, k, kp, hp, lp, g, end, **kwargs):
+        """Renvoie le résultat de simulate() avec ces arguments, en ne simulant que s'il n'est pas déjà en mémoire
+
+        Args:
+            m, k, kp, hp, lp, g, end (float): Les paramètres physiques (voir simulate())
+            **kwargs : Les autres arguments de simulate()
+
+        Returns:
+            SimulationResult: Les données de la simulation (tableaux en lecture seule, partagés entre les appels)
+        """
+        key = simulationKey(m, k, kp, hp, lp, g, end, **kwargs)
+        if key in self.results:
+            self.hits += 1
+            self.results.move_to_end(key)
+            return self.results[key]
+
+        self.misses += 1
+        result = self.simulator(m, k, kp, hp, lp, g, end, **kwargs)
+        for array in (result.t, result.x, result.y, result.v, result.a, result.e_cin, result.e_pot, result.e_tot):
+            array.setflags(write=False)
+        self.results[key] = result
+        while len(self.results) > self.maxSize:
+            self.results.popitem(last=False)
+        return result
+
+    def clear(self):
+        """Oublie tous les résultats (les compteurs sont gardés)
+        """
+        self.results.clear()
+
+
+def simulateBatch(m, k, kp, hp, lp, g, end, step=0.001, stepPente=0.001, groundEngine="exact", stopSpeed=None, stopEnergy=None, stopPadding=0, profile=None):
+    """Simule N jeux de paramètres à la fois (calcul vectorisé sur l'axe des paramètres, sur la pente et sur le sol)
+
+    Args:
+        m (numpy.ndarray): Les masses du véhicule [kg]
+        k (numpy.ndarray): Les coefficients de frottement sur le sol [kg/s]
+        kp (numpy.ndarray): Les coefficients de frottement sur la pente [kg/s]
+        hp (numpy.ndarray): Les hauteurs de la pente [m]
+        lp (numpy.ndarray): Les largeurs de la pente [m]
+        g (numpy.ndarray): Les constantes de gravitation [m/s²]
+        (m, k, kp, hp, lp et g sont des tableaux de taille N ou des nombres, communs à tous les jeux de paramètres)
+        end (float): La durée simulée sur le sol [s]
+        step (float, optional): Le pas de temps sur le sol [s]. Defaults to 0.001.
+        stepPente (float, optional): La taille des découpes de la pente [m]. Defaults to 0.001.
+        groundEngine (str, optional): La méthode de calcul sur le sol ("exact" ou "euler", voir simulateGround()). Defaults to "exact".
+        stopSpeed, stopEnergy, stopPadding (float, optional): Le critère d'arrêt (voir simulate()). La simulation s'arrête
+            quand tous les véhicules sont arrêtés ; stopTime et stopDistance sont des tableaux de taille N (NaN si pas d'arrêt).
+        profile (SlopeProfile, optional): La forme de toutes les pentes (voir SlopeProfiles.py). Defaults to None (pente exponentielle).
+
+    Returns:
+        SimulationResult: Les données des N simulations, dans des tableaux de forme (N, T).
+            Les pentes plus courtes ont moins de découpes : le début de leurs lignes est rempli de NaN
+            (la fin de la pente est toujours à la même colonne pour toutes les lignes).
+    """
+    m, k, kp, hp, lp, g = [np.atleast_1d(param).astype(float) for param in np.broadcast_arrays(m, k, kp, hp, lp, g)]
+
+    ## Simulation pente (les N pentes sont avancées ensemble, découpe par découpe)
+    nPente = np.ceil(lp / stepPente).astype(int) #Nombre de découpes de chaque pente (comme np.arange(-lp, 0, stepPente))
+    size = np.max(nPente)
+    index = np.arange(size)
+    valid = index < nPente[:, None]
+    xPente = -lp[:, None] + index * stepPente
+    yPente = (profile or SlopeProfiles.EXPONENTIAL).height(xPente, hp[:, None], lp[:, None])
+
+    #Angle et taille de chaque petit bout de pente (le dernier bout de chaque pente est plat)
+    angles = np.zeros_like(xPente)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        angles[:, :-1] = np.arctan((yPente[:, :-1] - yPente[:, 1:]) / (xPente[:, 1:] - xPente[:, :-1]))
+    angles[index >= nPente[:, None] - 1] = 0
+    lengths = np.zeros_like(xPente)
+    lengths[:, 1:] = np.sqrt((xPente[:, 1:]-xPente[:, :-1])**2+(yPente[:, 1:]-yPente[:, :-1])**2)
+
+    vPente = np.zeros_like(xPente)
+    aPente = np.zeros_like(xPente)
+    tPente = np.zeros_like(xPente)
+    aPente[:, 0] = g
+    for i in range(1, size):
+        vi = vPente[:, i-1]
+        a = g * np.sin(angles[:, i-1]) - (kp * vi) / m
+        vf = np.sqrt(2*a*lengths[:, i] + vi**2)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            dt = (-vi + vf) / a #(Pentes déjà terminées : 0/0, valeur ignorée ci-dessous)
+
+        #Les pentes déjà terminées gardent leurs dernières valeurs
+        active = valid[:, i]
+        aPente[:, i] = np.where(active, a, aPente[:, i-1])
+        vPente[:, i] = np.where(active, vf, vi)
+        tPente[:, i] = np.where(active, tPente[:, i-1] + dt, tPente[:, i-1])
+
+    exitSpeed = vPente[:, -1] #(Le dernier bout de pente est plat : toute la vitesse est horizontale)
+    exitTime = tPente[:, -1]
+    vxPente = vPente * np.cos(angles)
+    vyPente = - vPente * np.sin(angles)
+
+    #Aligner toutes les pentes sur leur fin (remplissage par NaN au début)
+    source = index - (size - nPente[:, None])
+    aligned = lambda array: np.where(source >= 0, np.take_along_axis(array, np.clip(source, 0, None), axis=1), np.nan)
+    xPente, yPente, tPente, aPente = aligned(xPente), aligned(yPente), aligned(tPente), aligned(aPente)
+    vPente = np.sqrt(aligned(vxPente)**2+aligned(vyPente)**2)
+
+    ## Simulation sol
+    threshold = stopThreshold(m, stopSpeed, stopEnergy)
+    if threshold is not None:
+        end = min(end, np.max(groundStopTime(exitSpeed, k, m, threshold)) + stopPadding + step)
+    t = np.arange(0, end, step)
+    if groundEngine == "exact":
+        x, v, a = groundExact(exitSpeed[:, None], k[:, None], m[:, None], t)
+    elif groundEngine == "euler":
+        x = np.zeros((len(m), len(t)))
+        v = np.zeros_like(x)
+        a = np.zeros_like(x)
+        v[:, 0] = exitSpeed
+        for i in range(len(t)-1):
+            a[:, i] = -k*v[:, i]/m
+            v[:, i+1] = v[:, i] + (a[:, i] * step)
+            x[:, i+1] = x[:, i] + (v[:, i] * step)
+    else:
+        raise ValueError(f"Unknown ground engine: {groundEngine}")
+
+    if threshold is not None:
+        stopped = v <= np.broadcast_to(threshold, m.shape)[:, None]
+        first = np.argmax(stopped, axis=1)
+        hasStopped = np.any(stopped, axis=1)
+        stopTime = np.where(hasStopped, t[first], np.nan)
+        stopDistance = np.where(hasStopped, x[np.arange(len(m)), first], np.nan)
+
+    #Rassembler les données de la pente et du sol
+    t = np.concatenate((tPente - exitTime[:, None], np.broadcast_to(t, x.shape)), axis=1)
+    x = np.concatenate((xPente, x), axis=1)
+    y = np.concatenate((yPente, np.zeros_like(v)), axis=1)
+    v = np.concatenate((vPente, v), axis=1)
+    a = np.concatenate((aPente, a), axis=1)
+
+    result = SimulationResult(t, x, y, v, a, m[:, None], g[:, None])
+    if threshold is not None:
+        result.stopTime, result.stopDistance = stopTime, stopDistance
+    return result
+
+
+def simulateSettings(settings, cache=None, **kwargs):
+    """Simule à partir d'un dictionnaire de paramètres (comme celui de PhysicsSimulation)
+
+    Args:
+        settings (dict): Les paramètres ("m", "k", "kp", "Fin", "hp", "lp", "g")
+        cache (SimulationCache, optional): Le cache où chercher (et garder) le résultat. Defaults to None.
+        **kwargs : Les autres arguments de simulate() (step, stepPente, ...)
+
+    Returns:
+        SimulationResult: Les données de la simulation
+    """
+    return (cache.simulate if cache is not None else simulate)(settings["m"], settings["k"], settings["kp"], settings["hp"], settings["lp"], settings["g"], settings["Fin"], **kwargs)
+
+
+class SimulationWorker:
+    """Thread qui calcule les simulations en arrière-plan. Seule la dernière demande compte :
+        une demande qui attend encore est remplacée par la suivante, et le résultat d'une demande dépassée est oublié"""
+
+    def __init__(self, simulator=simulateSettings):
+        """Initialise et démarre le thread
+
+        Args:
+            simulator (function, optional): La fonction qui calcule une demande (appelée avec les arguments donnés à submit()). Defaults to simulateSettings.
+        """
+        self.simulator = simulator
+        self.condition = threading.Condition()
+        self.lastId = 0 #Numéro de la dernière demande
+        self.pending = None #Demande qui attend d'être calculée : (numéro, args, kwargs)
+        self.running = None #Numéro de la demande en cours de calcul
+        self.finished = None #Dernier résultat pas encore récupéré : (numéro, résultat, erreur)
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def submit(self, *args, **kwargs):
+        """Demande une simulation (remplace la demande précédente si elle n'a pas encore commencé)
+
+        Returns:
+            int: Le numéro de la demande
+        """
+        with self.condition:
+            self.lastId += 1
+            self.pending = (self.lastId, args, kwargs)
+            self.condition.notify()
+            return self.lastId
+
+    def poll(self):
+        """Récupère le résultat de la dernière demande s'il est prêt (sans attendre)
+
+        Returns:
+            tuple (SimulationResult, Exception): Le résultat et l'erreur éventuelle, ou None s'il n'est pas prêt
+        """
+        with self.condition:
+            finished, self.finished = self.finished, None
+        return None if finished is None else finished[1:]
+
+    def busy(self):
+        """Indique si une demande est en attente ou en cours de calcul
+
+        Returns:
+            bool: True si une simulation est en attente ou en cours
+        """
+        with self.condition:
+            return self.pending is not None or self.running is not None
+
+    def run(self):
+        """Boucle du thread : calcule les demandes les unes après les autres
+        """
+        while True:
+            with self.condition:
+                while self.pending is None:
+                    self.condition.wait()
+                (self.running, args, kwargs), self.pending = self.pending, None
+
+            result, error = None, None
+            try:
+                result = self.simulator(*args, **kwargs)
+            except Exception as e:
+                error = e
+
+            with self.condition:
+                if self.running == self.lastId: #(Sinon, une nouvelle demande est arrivée pendant le calcul)
+                    self.finished = (self.running, result, error)
+                self.running = None
@@ -0,0 +1,183 @@
+#Equipe 1155
+#SlopeProfiles : Formes de pente utilisables par la simulation (exponentielle, fonction quelconque, points mesurés ou fonction la plus proche de ces points)
+
+import hashlib
+import numpy as np
+
+
+class SlopeProfile:
+    """Forme de la pente : hauteur y(x, h, w) et ses dérivées pour x entre -w et 0 (haut de la pente en x=-w, bas en x=0).
+        Deux profils avec la même clé ("key") sont considérés comme identiques (caches des simulations).
+        Sans clé donnée, le profil n'est identifié que par sa fonction pendant ce lancement (persistent = False) :
+        le résultat d'une fonction peut dépendre de variables globales ou d'autres fonctions, ses simulations ne sont donc pas gardées sur le disque (ResultStore)"""
+
+    def __init__(self, height, derivative=None, secondDerivative=None, key=None, size=None):
+        """Crée le profil
+
+        Args:
+            height (function): La hauteur de la pente y(x, h, w) [m] (x : numpy.ndarray, h : hauteur de la pente, w : largeur de la pente)
+            derivative (function, optional): La dérivée dy/dx(x, h, w). Defaults to None (calculée par différences finies).
+            secondDerivative (function, optional): La dérivée seconde d²y/dx²(x, h, w). Defaults to None (calculée par différences finies).
+            key (str, optional): Le nom qui identifie le profil d'un lancement à l'autre (à changer quand la forme change). Defaults to None (profil identifié par sa fonction, seulement pendant ce lancement).
+            size (tuple, optional): La hauteur et la largeur de la pente réelle (hp et lp pour la reproduire) [m]. Defaults to None.
+        """
+        self.height = height
+        self.derivative = derivative if derivative is not None else self.numericalDerivative
+        self.secondDerivative = secondDerivative if secondDerivative is not None else self.numericalSecondDerivative
+        self.persistent = key is not None
+        self.key = key if key is not None else f"callable:{getattr(height, '__qualname__', type(height).__name__)}@{id(height):x}"
+        self.size = size
+
+    def __call__(self, x, h, w):
+        return self.height(x, h, w)
+
+    def __eq__(self, other):
+        return isinstance(other, SlopeProfile) and other.key == self.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __repr__(self):
+        return f"SlopeProfile({self.key!r})" #(Utilisé dans les clés de ResultStore)
+
+    def numericalDerivative(self, x, h, w):
+        """Calcule dy/dx par différences finies centrées
+
+        Args:
+            x (numpy.ndarray): Les abscisses (entre -w et 0) [m]
+            h (float): La hauteur de la pente [m]
+            w (float): La largeur de la pente [m]
+
+        Returns:
+            numpy.ndarray: La pente dy/dx en chaque abscisse
+        """
+        dx = 1e-6 * w
+        return (self.height(x + dx, h, w) - self.height(x - dx, h, w)) / (2 * dx)
+
+    def numericalSecondDerivative(self, x, h, w):
+        """Calcule d²y/dx² par différences finies centrées
+
+        Args:
+            x (numpy.ndarray): Les abscisses (entre -w et 0) [m]
+            h (float): La hauteur de la pente [m]
+            w (float): La largeur de la pente [m]
+
+        Returns:
+            numpy.ndarray: La dérivée seconde en chaque abscisse [1/m]
+        """
+        dx = 1e-4 * w
+        return (self.height(x + dx, h, w) - 2 * self.height(x, h, w) + self.height(x - dx, h, w)) / dx**2
+
+
+class TabulatedProfile(SlopeProfile):
+    """Forme de pente passant par des points mesurés (spline cubique), mise à l'échelle de h et w (voir tabulatedProfile())"""
+
+    def __init__(self, u, shape, key, size):
+        """Crée le profil
+
+        Args:
+            u (numpy.ndarray): Les abscisses sans dimension des points, de -1 (haut de la pente) à 0 (bas)
+            shape (numpy.ndarray): Les hauteurs sans dimension des points (1 en haut de la pente)
+            key (str): Le nom qui identifie le profil
+            size (tuple): La hauteur et la largeur de la pente réelle [m]
+        """
+        from scipy.interpolate import CubicSpline #(Importé seulement ici : SciPy est long à charger)
+        self.spline = CubicSpline(u, shape)
+        super().__init__(self.splineHeight, self.splineDerivative, self.splineSecondDerivative, key, size)
+
+    def splineHeight(self, x, h, w):
+        """Hauteur de la pente [m] (voir SlopeProfile)"""
+        return h * self.spline(x / w)
+
+    def splineDerivative(self, x, h, w):
+        """Dérivée dy/dx de la pente (voir SlopeProfile)"""
+        return h / w * self.spline(x / w, 1)
+
+    def splineSecondDerivative(self, x, h, w):
+        """Dérivée seconde d²y/dx² de la pente [1/m] (voir SlopeProfile)"""
+        return h / w**2 * self.spline(x / w, 2)
+
+
+def exponentialHeight(x, h, w):
+    """Hauteur de la pente exponentielle [m] (voir SimulationCore.slopeProfile())"""
+    return h*np.e**((-3.5*x)/w-3.5) #La fonction la plus proche de notre pente
+
+
+def exponentialDerivative(x, h, w):
+    """Dérivée dy/dx de la pente exponentielle"""
+    return (-3.5/w)*h*np.e**((-3.5*x)/w-3.5)
+
+
+def exponentialSecondDerivative(x, h, w):
+    """Dérivée seconde d²y/dx² de la pente exponentielle [1/m]"""
+    return (3.5/w)**2*h*np.e**((-3.5*x)/w-3.5)
+
+
+EXPONENTIAL = SlopeProfile(exponentialHeight, exponentialDerivative, exponentialSecondDerivative, key="exponential") #Pente utilisée par défaut
+
+
+def tabulatedProfile(x, y, key=None):
+    """Crée un profil à partir de points mesurés de la pente (spline cubique passant par les points).
+        La pente est mise à l'échelle de hp et lp : avec hp = profile.size[0] et lp = profile.size[1], elle passe exactement par les points
+
+    Args:
+        x (list): Les abscisses des points [m] (le haut de la pente peut être à gauche ou à droite)
+        y (list): Les hauteurs des points, par rapport au sol [m]
+        key (str, optional): Le nom qui identifie le profil. Defaults to None (empreinte des points).
+
+    Returns:
+        TabulatedProfile: Le profil
+    """
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    order = np.argsort(x)
+    x, y = x[order], y[order]
+    if len(x) < 2:
+        raise ValueError("A slope profile needs at least two points")
+    if y[0] < y[-1]:
+        #Le haut de la pente est à droite : on la retourne (le véhicule descend toujours vers x=0)
+        x, y = -x[::-1], y[::-1]
+    width, height = x[-1] - x[0], y[0]
+    if width <= 0 or height <= 0:
+        raise ValueError("A slope profile needs a positive width and height")
+
+    #Forme sans dimension : u entre -1 (haut) et 0 (bas), hauteur 1 en haut
+    u = (x - x[-1]) / width
+    shape = y / height
+    if key is None:
+        key = "table:" + hashlib.sha256(np.stack((u, shape)).tobytes()).hexdigest()[:16]
+    return TabulatedProfile(u, shape, key, (float(height), float(width)))
+
+
+def fittedProfile(points, **kwargs):
+    """Crée un profil à partir de la fonction (polynôme ou exponentielle) la plus proche de points mesurés de la pente (voir CurveFitting.curve_fitting())
+
+    Args:
+        points (list): Les points (x, y) de la pente [m]
+        **kwargs : Les arguments de curve_fitting() (deg=..., oddTerms=... ou exp=True)
+
+    Returns:
+        TabulatedProfile: Le profil (la fonction, évaluée en 51 points sur l'intervalle des points mesurés, voir tabulatedProfile())
+    """
+    from CurveFitting import curve_fitting #(Importé seulement ici : CurveFitting charge SciPy)
+    xPoints = [float(point[0]) for point in points]
+    interval = (min(xPoints), max(xPoints))
+    expression, functionPoints = curve_fitting(points, interval=interval, **kwargs)
+    margin = (interval[1] - interval[0]) / 100
+    x, y = zip(*[(xPoint, yPoint) for (xPoint, yPoint) in functionPoints if xPoint <= interval[1] + margin]) #(np.arange peut ajouter un point de trop)
+    return tabulatedProfile(x, y, key="fit:" + expression + ":" + hashlib.sha256(np.array((x, y)).tobytes()).hexdigest()[:16])
+
+
+def loadProfile(filename, **kwargs):
+    """Charge un profil depuis un fichier texte de points mesurés de la pente (colonnes x et y [m])
+
+    Args:
+        filename (str): Le fichier
+        **kwargs : Si donnés, les arguments de CurveFitting.curve_fitting() : le profil est la fonction la plus proche des points (voir fittedProfile())
+
+    Returns:
+        SlopeProfile: Le profil
+    """
+    (x, y) = np.loadtxt(filename, ndmin=2).T[:2]
+    if kwargs:
+        return fittedProfile(list(zip(x, y)), **kwargs)
+    return tabulatedProfile(x, y)
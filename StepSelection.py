@@ -0,0 +1,208 @@
+#Equipe 1155
+#StepSelection : Choisit automatiquement les pas de la simulation (step et stepPente) les plus grands qui donnent la précision voulue
+
+import time
+import numpy as np
+import SimulationCore
+import SlopeProfiles
+
+QUANTITIES = ("exitSpeed", "stopDistance", "energy") #Grandeurs sur lesquelles on peut donner une précision
+
+
+def refineStep(function, step, tolerance, minStep):
+    """Divise le pas par deux jusqu'à ce que l'erreur estimée soit inférieure à la précision voulue (extrapolation de Richardson)
+
+    Args:
+        function (function): La grandeur calculée avec un certain pas
+        step (float): Le premier pas essayé (grand)
+        tolerance (float): L'erreur maximale voulue
+        minStep (float): Le plus petit pas essayé
+
+    Returns:
+        dict: Le pas choisi ("step"), la grandeur avec ce pas ("value"), l'erreur estimée ("error"), l'ordre de convergence observé ("order"),
+            si la précision est atteinte ("met"), le nombre de calculs ("evaluations") et le temps de calcul (processeur) de la grandeur avec le pas choisi ("time") [s]
+    """
+    def timed(step):
+        start = time.process_time()
+        value = function(step)
+        return value, time.process_time() - start
+
+    (value, lastTime) = timed(step)
+    values = [value]
+    while True:
+        step /= 2
+        (value, lastTime) = timed(step)
+        values.append(value)
+
+        #Ordre de convergence observé (erreur ~ C * step^order), 1 tant qu'on n'a pas trois valeurs
+        order = 1
+        if len(values) >= 3 and values[-1] != values[-2] and values[-2] != values[-3]:
+            order = float(np.clip(np.log2(abs(values[-2] - values[-3]) / abs(values[-1] - values[-2])), 0.5, 4))
+        error = abs(values[-1] - values[-2]) / (2**order - 1)
+
+        if error <= tolerance or step / 2 < minStep:
+            return {"step": step, "value": values[-1], "error": error, "order": order, "met": error <= tolerance, "evaluations": len(values), "time": lastTime}
+
+
+def chooseSteps(m, k, kp, hp, lp, g, end, tolerance, quantity="exitSpeed", groundEngine="euler", slopeEngine="segments", stopSpeed=None, stopEnergy=None, minStep=1e-6, profile=None):
+    """Choisit les plus grands pas (step et stepPente, divisés par deux à partir de pas grossiers) pour lesquels l'erreur estimée
+        sur une grandeur est inférieure à la précision voulue
+
+    Args:
+        m, k, kp, hp, lp, g, end (float): Les paramètres de la simulation (voir SimulationCore.simulate())
+        tolerance (float): L'erreur maximale voulue (même unité que la grandeur)
+        quantity (str, optional): La grandeur : "exitSpeed" (vitesse en fin de pente [m/s]), "energy" (énergie en fin de pente [J])
+            ou "stopDistance" (distance parcourue sur le sol [m], jusqu'à l'arrêt si stopSpeed ou stopEnergy est donné, sinon jusqu'à end). Defaults to "exitSpeed".
+        groundEngine, slopeEngine (str, optional): Les méthodes de calcul (voir SimulationCore.simulate()). Defaults to "euler" and "segments".
+        stopSpeed, stopEnergy (float, optional): Le critère d'arrêt (voir SimulationCore.simulate()). Defaults to None.
+        minStep (float, optional): Le plus petit pas essayé. Defaults to 1e-6.
+        profile (SlopeProfile, optional): La forme de la pente (voir SlopeProfiles.py). Defaults to None (pente exponentielle).
+
+    Returns:
+        dict: Les pas choisis ("step", "stepPente"), l'erreur estimée sur la grandeur ("error"), si la précision est atteinte ("met"),
+            le nombre de simulations de la pente et du sol utilisées ("evaluations") et le temps de calcul (processeur) de la pente
+            et du sol avec les pas choisis ("slopeTime", "groundTime" : None si le sol n'a pas été simulé) [s]
+    """
+    if quantity not in QUANTITIES:
+        raise ValueError(f"Unknown quantity: {quantity}")
+    exitSpeed = lambda stepPente: SimulationCore.simulateSlopePhase(kp, m, hp, lp, g, stepPente, slopeEngine, profile)[6]
+
+    if quantity == "exitSpeed":
+        slope = refineStep(exitSpeed, lp / 8, tolerance, minStep)
+    elif quantity == "energy":
+        slope = refineStep(lambda stepPente: m * exitSpeed(stepPente)**2 / 2, lp / 8, tolerance, minStep)
+    if quantity != "stopDistance":
+        #(Le pas sur le sol ne change pas ces grandeurs : on garde un pas grossier)
+        return {"step": 0.01, "stepPente": slope["step"], "error": slope["error"], "met": slope["met"], "evaluations": slope["evaluations"], "slopeTime": slope["time"], "groundTime": None}
+
+    #Distance sur le sol : la moitié de l'erreur pour la pente (distance = m/k * vitesse en fin de pente au plus), la moitié pour le sol
+    sensitivity = m / k if k > 0 else end
+    slope = refineStep(exitSpeed, lp / 8, tolerance / 2 / sensitivity, minStep)
+    threshold = SimulationCore.stopThreshold(m, stopSpeed, stopEnergy)
+
+    def distance(step):
+        t, x, v, a = SimulationCore.simulateGround(slope["value"], k, m, end, step, groundEngine, threshold)
+        stopDistance = SimulationCore.groundStop(t, x, v, threshold)[1] if threshold is not None else None
+        return stopDistance if stopDistance is not None else (x[-1] if len(x) > 0 else 0)
+
+    ground = refineStep(distance, min(0.1, end / 4), tolerance / 2, minStep)
+    return {
+        "step": ground["step"],
+        "stepPente": slope["step"],
+        "error": slope["error"] * sensitivity + ground["error"],
+        "met": slope["met"] and ground["met"],
+        "evaluations": slope["evaluations"] + ground["evaluations"],
+        "slopeTime": slope["time"],
+        "groundTime": ground["time"]
+    }
+
+
+class StepSelector:
+    """Choisit les pas avec chooseSteps() et les garde pour chaque domaine de paramètres
+        (paramètres arrondis à deux chiffres significatifs : les pas choisis pour des paramètres proches sont réutilisés)"""
+
+    def __init__(self, tolerance, quantity="exitSpeed", groundEngine="euler", slopeEngine="segments", stopSpeed=None, stopEnergy=None, timeReport=False):
+        """Initialise le sélecteur (aucun pas en mémoire)
+
+        Args:
+            tolerance (float): L'erreur maximale voulue
+            quantity (str, optional): La grandeur (voir chooseSteps()). Defaults to "exitSpeed".
+            groundEngine, slopeEngine, stopSpeed, stopEnergy (optional): Voir chooseSteps().
+            timeReport (bool, optional): Mesurer le temps gagné à chaque nouveau choix de pas (deux simulations de plus, voir report())
+                au lieu de l'estimer (voir describe()). Defaults to False.
+        """
+        self.tolerance = tolerance
+        self.quantity = quantity
+        self.options = {"groundEngine": groundEngine, "slopeEngine": slopeEngine, "stopSpeed": stopSpeed, "stopEnergy": stopEnergy}
+        self.timeReport = timeReport
+        self.steps = {} #Pas choisis pour chaque domaine de paramètres
+        self.reports = {} #Rapport de chaque choix de pas (voir describe() et report())
+        self.lastReport = None #Rapport des pas des derniers paramètres donnés à choose()
+
+    def regime(self, m, k, kp, hp, lp, g, end, profile=None):
+        """Renvoie le domaine de paramètres (paramètres arrondis à deux chiffres significatifs, et forme de la pente)
+
+        Args:
+            m, k, kp, hp, lp, g, end (float): Les paramètres de la simulation
+            profile (SlopeProfile, optional): La forme de la pente (voir SlopeProfiles.py). Defaults to None (pente exponentielle).
+
+        Returns:
+            tuple: Le domaine
+        """
+        return tuple(float(f"{param:.2g}") for param in (m, k, kp, hp, lp, g, end)) + (profile or SlopeProfiles.EXPONENTIAL,)
+
+    def choose(self, m, k, kp, hp, lp, g, end, profile=None):
+        """Renvoie les pas pour ces paramètres (choisis avec chooseSteps() si le domaine de paramètres est nouveau)
+
+        Args:
+            m, k, kp, hp, lp, g, end (float): Les paramètres de la simulation
+            profile (SlopeProfile, optional): La forme de la pente (voir SlopeProfiles.py). Defaults to None (pente exponentielle).
+
+        Returns:
+            (float, float): step, stepPente
+        """
+        regime = self.regime(m, k, kp, hp, lp, g, end, profile)
+        if regime not in self.steps:
+            start = time.process_time()
+            choice = chooseSteps(m, k, kp, hp, lp, g, end, self.tolerance, self.quantity, profile=profile, **self.options)
+            choice["selectionTime"] = time.process_time() - start
+            self.steps[regime] = choice
+            self.reports[regime] = self.report(m, k, kp, hp, lp, g, end, choice, profile=profile) if self.timeReport else self.describe(choice)
+        self.lastReport = self.reports[regime]
+        return self.steps[regime]["step"], self.steps[regime]["stepPente"]
+
+    def errorText(self, choice):
+        """Décrit les pas choisis et l'erreur estimée
+
+        Args:
+            choice (dict): Le résultat de chooseSteps()
+
+        Returns:
+            str: La description
+        """
+        return (f"step = {choice['step']:.3g} s, stepPente = {choice['stepPente']:.3g} m : erreur estimée sur {self.quantity} = {choice['error']:.2g}"
+                f"{'' if choice['met'] else ' (précision non atteinte)'}")
+
+    def describe(self, choice, step=0.001, stepPente=0.001):
+        """Décrit un choix de pas et estime le temps gagné par rapport aux pas fixes par défaut, sans simulation de plus :
+            le temps de calcul des dernières simulations de chooseSteps() (avec les pas choisis) est multiplié par le rapport des nombres de points
+            (le sol n'est compté que s'il a été simulé, c'est-à-dire pour "stopDistance")
+
+        Args:
+            choice (dict): Le résultat de chooseSteps()
+            step, stepPente (float, optional): Les pas fixes par défaut. Defaults to 0.001.
+
+        Returns:
+            dict: Le résultat de chooseSteps(), le temps gagné estimé par simulation ("estimatedSaved") [s] et la description du tout ("text")
+        """
+        saved = choice["slopeTime"] * (choice["stepPente"] / stepPente - 1)
+        if choice["groundTime"] is not None:
+            saved += choice["groundTime"] * (choice["step"] / step - 1)
+        text = self.errorText(choice) + f", environ {abs(saved)*1000:.1f} ms {'gagnées' if saved >= 0 else 'perdues'} par simulation (pas par défaut : estimation)"
+        return dict(choice, estimatedSaved=saved, text=text)
+
+    def report(self, m, k, kp, hp, lp, g, end, choice, step=0.001, stepPente=0.001, profile=None):
+        """Compare le temps de calcul (processeur) d'une simulation avec les pas choisis et avec les pas fixes par défaut
+
+        Args:
+            m, k, kp, hp, lp, g, end (float): Les paramètres de la simulation
+            choice (dict): Le résultat de chooseSteps()
+            step, stepPente (float, optional): Les pas fixes par défaut. Defaults to 0.001.
+            profile (SlopeProfile, optional): La forme de la pente (voir SlopeProfiles.py). Defaults to None (pente exponentielle).
+
+        Returns:
+            dict: Le résultat de chooseSteps(), et les temps de calcul avec les pas choisis et avec les pas par défaut ("time", "defaultTime"),
+                le temps gagné par simulation ("saved") [s], et la description du tout ("text")
+        """
+        times = []
+        for (groundStep, slopeStep) in ((choice["step"], choice["stepPente"]), (step, stepPente)):
+            #(Pente calculée une première fois avant la mesure, par le même appel que simulate() : la découpe de la pente est alors en cache,
+            #comme quand seuls la masse ou les frottements changent)
+            SimulationCore.simulateSlopePhase(kp, m, hp, lp, g, slopeStep, self.options["slopeEngine"], profile)
+            start = time.process_time()
+            SimulationCore.simulate(m, k, kp, hp, lp, g, end, groundStep, slopeStep, profile=profile, **self.options)
+            times.append(time.process_time() - start)
+        report = self.describe(choice, step, stepPente)
+        report.update(time=times[0], defaultTime=times[1], saved=times[1] - times[0])
+        report["text"] = self.errorText(choice) + f", {times[0]*1000:.1f} ms au lieu de {times[1]*1000:.1f} ms (pas par défaut)"
+        return report